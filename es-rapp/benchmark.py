@@ -0,0 +1,314 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+# Benchmarks of the rApp hot paths with synthetic PM reports and local stub
+# servers for A1, SDN-C and the load predictor, e.g.
+#   python benchmark.py --cells 10,100,1000 --output benchmark.json
+#   python benchmark.py --only predict --model-dir models
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+import predictor_protocol
+from http_clients import EndpointClient
+from pm_generator import ReportGenerator, DEFAULT_COUNTERS
+from replay import LocalA1, LocalSdnc, LocalEndpoint, LocalTopology, LocalResponse, json_response
+
+log = logging.getLogger('main')
+
+BENCHMARKS = ('read_data', 'update_local_data', 'make_decision', 'predict')
+
+
+class StubServer:
+    # Serves a replay.LocalEndpoint over HTTP on a free local port
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def handle_method(self):
+                url = urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                content_type = self.headers.get('Content-Type', '').split(';')[0]
+                with stub.lock:
+                    response = stub.endpoint.handle(
+                        self.command, url.path, headers=dict(self.headers), params=dict(parse_qsl(url.query)),
+                        data=body, json=json.loads(body) if body and content_type == predictor_protocol.JSON else None)
+                self.send_response(response.status_code)
+                self.send_header('Content-Type', response.headers['Content-Type'])
+                self.send_header('Content-Length', str(len(response.content)))
+                self.end_headers()
+                self.wfile.write(response.content)
+
+            do_GET = do_PUT = do_POST = do_DELETE = handle_method
+
+            def log_message(self, format, *args):
+                pass
+
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class AlternatingPredictor(LocalEndpoint):
+    # Forecasts alternate between no load and full load, so every decision
+    # switches all capacity cells off or back on
+    def __init__(self):
+        self.requests = 0
+
+    def handle(self, method, path, headers=None, params=None, data=None, **kwargs):
+        if method == 'GET':
+            return json_response(200, {'ready': True})
+        self.requests += 1
+        horizon = int((params or {}).get('horizon', 1))
+        accept = (headers or {}).get('Accept', predictor_protocol.JSON)
+        load = 100 if self.requests % 2 == 0 else 0
+        return LocalResponse(200, predictor_protocol.dumps([load] * horizon, accept), accept)
+
+
+def summary(name, params, durations_sec, operations=None):
+    # Latency statistics in milliseconds and throughput in operations per second
+    durations = np.asarray(durations_sec) * 1e3
+    total_sec = float(np.sum(durations_sec))
+    operations = len(durations) if operations is None else operations
+    result = {
+        'name': name,
+        'params': params,
+        'samples': len(durations),
+        'mean_ms': float(np.mean(durations)),
+        'p50_ms': float(np.percentile(durations, 50)),
+        'p95_ms': float(np.percentile(durations, 95)),
+        'p99_ms': float(np.percentile(durations, 99)),
+        'max_ms': float(np.max(durations)),
+        'per_sec': operations / total_sec if total_sec > 0 else None,
+    }
+    print(f'{name:<18} {json.dumps(params):<52} p50 {result["p50_ms"]:9.3f} ms  p99 {result["p99_ms"]:9.3f} ms  '
+          f'{result["per_sec"] or 0:12.1f}/s')
+    return result
+
+
+def throughput(name, params, elapsed_sec, operations):
+    # For operations timed only as a whole batch; latency fields are left empty
+    result = {
+        'name': name,
+        'params': params,
+        'samples': operations,
+        'batch_ms': elapsed_sec * 1e3,
+        'mean_ms': None,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'max_ms': None,
+        'per_sec': operations / elapsed_sec if elapsed_sec > 0 else None,
+    }
+    print(f'{name:<18} {json.dumps(params):<52} batch {result["batch_ms"]:9.3f} ms{"":19}'
+          f'{result["per_sec"] or 0:12.1f}/s')
+    return result
+
+
+def benchmark_application(data_path, a1_port, sdnc_port, predictor_port, avg_slots):
+    os.environ.update(A1T_ADDRESS='127.0.0.1', A1T_PORT=str(a1_port),
+                      SDN_CONTROLLER_ADDRESS='127.0.0.1', SDN_CONTROLLER_PORT=str(sdnc_port),
+                      LOAD_PREDICTOR='127.0.0.1', LOAD_PREDICTOR_PORT=str(predictor_port), LOAD_PREDICTOR_API='predict',
+                      RANSIM_DATA_PATH=data_path, PRB_STORE_PATH=tempfile.mkdtemp(prefix='prb-store-', dir=data_path),
+                      POLICY_REGISTRY_PATH=os.path.join(tempfile.mkdtemp(prefix='policies-', dir=data_path), 'policies.json'))
+    os.environ.setdefault('SDN_CONTROLLER_USERNAME', 'benchmark')
+    os.environ.setdefault('SDN_CONTROLLER_PASSWORD', 'benchmark')
+    os.environ.setdefault('CAPACITY_CELLS', '*')
+    # read_data is measured on every report, not on a merged backlog
+    os.environ.setdefault('REPORT_COALESCE_INTERVAL_SEC', '0')
+    from main import Application
+    app = Application(sleep_time_sec=10.0, sleep_after_decision_sec=120.0, avg_slots=avg_slots)
+    # The topology is not part of the measured paths
+    app.topology = LocalTopology()
+    return app
+
+
+def bench_read_data(app, workdir, generator, reports):
+    from report_watcher import ReportWatcher
+    data_path = os.path.join(workdir, f'reports-{len(generator.cell_ids)}')
+    os.makedirs(data_path)
+    app.watcher = ReportWatcher(data_path, 0, use_inotify=False)
+    # Start the parser processes, if any, before measuring
+    for _ in range(2):
+        generator.write(data_path)
+    app.watcher.scan()
+    app.read_data()
+    for _ in range(reports):
+        generator.write(data_path)
+    app.watcher.scan()
+    started = time.perf_counter()
+    loaded = app.read_data()
+    elapsed = time.perf_counter() - started
+    shutil.rmtree(data_path)
+    # The reports are read as one batch (split across the parser processes), so there
+    # is no latency per report, only the throughput of the batch
+    return throughput('read_data', dict(cells=len(generator.cell_ids), reports=len(loaded), workers=app.parser.workers),
+                      elapsed, len(loaded))
+
+
+def bench_update_local_data(app, generator, reports):
+    batch = [json.loads(json.dumps(generator.report())) for _ in range(reports)]
+    durations = []
+    for data in batch:
+        started = time.perf_counter()
+        app.update_local_data(data)
+        durations.append(time.perf_counter() - started)
+    return summary('update_local_data', dict(cells=len(generator.cell_ids), counters=len(generator.counters)), durations)
+
+
+def bench_make_decision(app, generator, decisions):
+    # Every decision follows a new report and queries the predictor, whose forecasts
+    # alternate, so it switches all capacity cells and the A1 and SDN-C calls are included
+    while len(app.prb_history) < app.prb_history.capacity:
+        app.update_local_data(generator.report())
+    app.sync_policies(force=True)
+    durations = []
+    for _ in range(decisions):
+        app.update_local_data(generator.report())
+        app.forecast_plan.clear()
+        started = time.perf_counter()
+        app.make_decision()
+        durations.append(time.perf_counter() - started)
+    return summary('make_decision', dict(cells=len(generator.cell_ids), switching=True), durations)
+
+
+def start_predictor(model_dir):
+    # prediction_rapp_v1 in-process on a free port
+    os.environ['MODEL_DIR'] = model_dir
+    from werkzeug.serving import make_server
+    import prediction_rapp_v1
+    prediction_rapp_v1.load_model()
+    prediction_rapp_v1.start_batcher()
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, prediction_rapp_v1.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}/predict'
+
+
+def bench_predict(url, content_type, concurrency, requests_total, look_back=8):
+    rng = np.random.default_rng(0)
+    windows = [rng.integers(0, 100, look_back).tolist() for _ in range(requests_total)]
+    headers = {'Content-Type': content_type, 'Accept': content_type}
+    local = threading.local()
+
+    def call(values):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = EndpointClient(url, retries=0)
+        started = time.perf_counter()
+        response = client.post(headers=headers, data=predictor_protocol.dumps(values, content_type))
+        response.raise_for_status()
+        predictor_protocol.loads(response.content, content_type)
+        return time.perf_counter() - started
+
+    # Warm up connections and the model
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(call, windows[:concurrency]))
+        started = time.perf_counter()
+        durations = list(pool.map(call, windows))
+        elapsed = time.perf_counter() - started
+    result = summary('predict', dict(format=content_type, concurrency=concurrency), durations)
+    # Wall clock throughput with concurrent clients
+    result['per_sec'] = requests_total / elapsed
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the rApp pipeline and the load predictor')
+    parser.add_argument('--cells', default='10,100,1000', help='Comma separated cell counts')
+    parser.add_argument('--counters', default=','.join(DEFAULT_COUNTERS))
+    parser.add_argument('--reports', type=int, default=200, help='Reports per read_data and update_local_data run')
+    parser.add_argument('--ingest-workers', type=int, default=0, help='INGEST_WORKERS of the rApp for read_data')
+    parser.add_argument('--decisions', type=int, default=20, help='make_decision calls per run')
+    parser.add_argument('--avg-slots', type=int, default=5)
+    parser.add_argument('--predictor-url', default='', help='Benchmark a running predictor instead of starting one')
+    parser.add_argument('--model-dir', default='models', help='Model artifacts for the in-process predictor')
+    parser.add_argument('--predict-requests', type=int, default=500)
+    parser.add_argument('--concurrency', default='1,8,32', help='Comma separated numbers of concurrent /predict clients')
+    parser.add_argument('--only', default=','.join(BENCHMARKS), help='Comma separated benchmarks to run')
+    parser.add_argument('--output', default='benchmark.json', help='JSON file with the results')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    os.environ['INGEST_WORKERS'] = str(args.ingest_workers)
+    only = {name.strip() for name in args.only.split(',')}
+    counters = [c.strip() for c in args.counters.split(',') if c.strip()]
+    results = []
+    pipeline_metrics = {}
+    stubs = [StubServer(LocalA1()), StubServer(LocalSdnc()), StubServer(AlternatingPredictor())]
+    with tempfile.TemporaryDirectory(prefix='es-rapp-benchmark-') as workdir:
+        for cells in [int(c) for c in args.cells.split(',')]:
+            if not only & {'read_data', 'update_local_data', 'make_decision'}:
+                break
+            app = benchmark_application(workdir, *(stub.port for stub in stubs), args.avg_slots)
+            log.setLevel(args.log_level.upper())
+            generator = ReportGenerator(cells, counters)
+            if 'read_data' in only:
+                results.append(bench_read_data(app, workdir, generator, args.reports))
+            if 'update_local_data' in only:
+                results.append(bench_update_local_data(app, generator, args.reports))
+            if 'make_decision' in only:
+                results.append(bench_make_decision(app, generator, args.decisions))
+            # Per-stage breakdown as seen by the rApp's own instrumentation
+            pipeline_metrics[cells] = app.metrics.registry.snapshot()
+            app.close()
+
+    if 'predict' in only:
+        server = None
+        url = args.predictor_url
+        if not url:
+            server, url = start_predictor(args.model_dir)
+        for content_type in sorted(predictor_protocol.supported_types()):
+            for concurrency in [int(c) for c in args.concurrency.split(',')]:
+                results.append(bench_predict(url, content_type, concurrency, args.predict_requests))
+        if server is not None:
+            server.shutdown()
+    for stub in stubs:
+        stub.close()
+
+    with open(args.output, 'w') as file:
+        json.dump({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'results': results,
+            'pipeline_metrics': pipeline_metrics,
+        }, file, indent=2)
+    print(f'Results written to {args.output}')
@@ -0,0 +1,147 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+
+class Cell:
+    __slots__ = ('id', 'row', '_state', 'policy_list', 'kpis', 'store')
+
+    def __init__(self, cell_id: str, row: int, state, store):
+        self.id = cell_id
+        self.row = row
+        self._state = state
+        self.policy_list = []
+        # Latest values of the extra PM counters, keyed by counter name
+        self.kpis = {}
+        self.store = store
+
+    @property
+    def avg_prb_usage(self):
+        return self.store.average(self.row)
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        old_state = self._state
+        self._state = state
+        if self.store.observer is not None and state != old_state:
+            self.store.observer.state_changed(self, old_state, state)
+
+
+class CellStore:
+    # PRB samples of all cells live in one (cells x avg_slots) array used as a
+    # per-row ring buffer. Each row keeps its own head, running sum and fill
+    # count so that adding a sample and reading the average are O(1). The sum
+    # over all full rows is kept as well, for the fleet average. An observer
+    # is told about new cells and state changes.
+    def __init__(self, avg_slots: int, initial_state, capacity: int = 64, observer=None):
+        self.avg_slots = avg_slots
+        self.initial_state = initial_state
+        self.observer = observer
+        self.cells = {}
+        # Cell ids in row order
+        self.ids = []
+        self.samples = np.zeros((capacity, avg_slots))
+        self.heads = np.zeros(capacity, dtype=np.intp)
+        self.sums = np.zeros(capacity)
+        self.counts = np.zeros(capacity, dtype=np.intp)
+        self.full_rows = 0
+        self.full_sum = 0.0
+        self.updates = 0
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell_id):
+        return cell_id in self.cells
+
+    def __getitem__(self, cell_id) -> Cell:
+        return self.cells[cell_id]
+
+    def __iter__(self):
+        return iter(self.cells.values())
+
+    def add(self, cell_id: str) -> Cell:
+        row = len(self.cells)
+        if row == len(self.sums):
+            self.grow(2 * row)
+        cell = Cell(cell_id, row, self.initial_state, self)
+        self.cells[cell_id] = cell
+        self.ids.append(cell_id)
+        if self.observer is not None:
+            self.observer.cell_added(cell)
+        return cell
+
+    def grow(self, capacity: int):
+        n = len(self.sums)
+        self.samples = np.concatenate((self.samples, np.zeros((capacity - n, self.avg_slots))))
+        self.heads = np.concatenate((self.heads, np.zeros(capacity - n, dtype=np.intp)))
+        self.sums = np.concatenate((self.sums, np.zeros(capacity - n)))
+        self.counts = np.concatenate((self.counts, np.zeros(capacity - n, dtype=np.intp)))
+
+    def update(self, cell_id: str, value: float) -> Cell:
+        cell = self.cells.get(cell_id)
+        if cell is None:
+            cell = self.add(cell_id)
+
+        row = cell.row
+        head = self.heads[row]
+        if self.counts[row] == self.avg_slots:
+            self.full_sum -= self.sums[row]
+            self.sums[row] -= self.samples[row, head]
+        else:
+            self.counts[row] += 1
+            if self.counts[row] == self.avg_slots:
+                self.full_rows += 1
+        self.samples[row, head] = value
+        self.sums[row] += value
+
+        head += 1
+        if head == self.avg_slots:
+            head = 0
+            # Re-sum once per lap to keep rounding drift of the running sum bounded
+            self.sums[row] = self.samples[row].sum()
+        self.heads[row] = head
+        if self.counts[row] == self.avg_slots:
+            self.full_sum += self.sums[row]
+
+        self.updates += 1
+        if self.updates >= len(self.cells) * self.avg_slots:
+            # Same for the sum over all rows, amortised over a lap of every row
+            self.updates = 0
+            n = len(self.cells)
+            self.full_sum = float(self.sums[:n][self.counts[:n] == self.avg_slots].sum())
+        return cell
+
+    def average(self, row: int) -> float:
+        if self.counts[row] < self.avg_slots:
+            return np.nan
+        return self.sums[row] / self.avg_slots
+
+    def total_average(self) -> float:
+        # Sum of all cell averages, NaN until every cell has a full window
+        if self.full_rows < len(self.cells):
+            return np.nan
+        return self.full_sum / self.avg_slots
+
+    def averages(self):
+        n = len(self.cells)
+        return np.where(self.counts[:n] == self.avg_slots, self.sums[:n] / self.avg_slots, np.nan)
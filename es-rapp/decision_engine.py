@@ -0,0 +1,77 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+ALL_CELLS = '*'
+
+
+def parse_cell_group(value: str):
+    # Comma separated cell ids, or '*' for every cell
+    value = value.strip()
+    if value == ALL_CELLS:
+        return ALL_CELLS
+    return {cell_id.strip() for cell_id in value.split(',') if cell_id.strip()}
+
+
+class DecisionEngine:
+    # Decides which cells to lock and unlock in one vectorised pass. Per-cell
+    # arrays are indexed by CellStore row. Capacity cells are locked when their
+    # forecast load drops below off_threshold and unlocked when it rises above
+    # on_threshold; after a change a cell keeps its state for at least
+    # min_hold_cycles decisions. Coverage cells are never locked.
+    def __init__(self, off_threshold: float, on_threshold: float, min_hold_cycles: int = 0,
+                 capacity_cells=ALL_CELLS, coverage_cells=()):
+        self.off_threshold = off_threshold
+        self.on_threshold = on_threshold
+        self.min_hold_cycles = min_hold_cycles
+        self.capacity_cells = capacity_cells
+        self.coverage_cells = set(coverage_cells)
+        self.capacity = np.zeros(0, dtype=bool)
+        self.locked = np.zeros(0, dtype=bool)
+        self.hold = np.zeros(0, dtype=np.int64)
+
+    def is_capacity_cell(self, cell_id):
+        if cell_id in self.coverage_cells:
+            return False
+        return self.capacity_cells == ALL_CELLS or cell_id in self.capacity_cells
+
+    def sync(self, cell_ids):
+        n = len(self.locked)
+        if len(cell_ids) == n:
+            return
+        new_ids = cell_ids[n:]
+        self.capacity = np.concatenate((self.capacity, [self.is_capacity_cell(cell_id) for cell_id in new_ids]))
+        self.locked = np.concatenate((self.locked, np.zeros(len(new_ids), dtype=bool)))
+        # New cells may change state right away
+        self.hold = np.concatenate((self.hold, np.full(len(new_ids), self.min_hold_cycles, dtype=np.int64)))
+
+    def decide(self, cell_ids, forecast):
+        # forecast: load per cell (NaN if unknown) or a single value for all cells.
+        # Returns the ids of the cells to lock and to unlock.
+        self.sync(cell_ids)
+        load = np.broadcast_to(np.asarray(forecast, dtype=float), self.locked.shape)
+
+        self.hold += 1
+        ready = self.hold > self.min_hold_cycles
+        lock = self.capacity & ~self.locked & ready & (load < self.off_threshold)
+        unlock = self.locked & ready & (load > self.on_threshold)
+
+        self.locked[lock] = True
+        self.locked[unlock] = False
+        self.hold[lock | unlock] = 0
+        return [cell_ids[i] for i in np.flatnonzero(lock)], [cell_ids[i] for i in np.flatnonzero(unlock)]
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Forward pass of the Dense load model in plain NumPy, so the predictor can
+# serve without a TensorFlow runtime. Weights are exported from the trained
+# Keras model into an .npz file next to the Keras artifact.
+
+import numpy as np
+
+ACTIVATIONS = {
+    'linear': None,
+    'relu': lambda x: np.maximum(x, 0, out=x),
+}
+
+
+def export_weights(model, path):
+    arrays = {}
+    activations = []
+    for index, layer in enumerate(model.layers):
+        config = layer.get_config()
+        if config.get('activation') not in ACTIVATIONS or len(layer.get_weights()) != 2:
+            raise ValueError(f'Layer {layer.name} is not a supported Dense layer')
+        kernel, bias = layer.get_weights()
+        arrays[f'kernel_{index}'] = kernel.astype(np.float32)
+        arrays[f'bias_{index}'] = bias.astype(np.float32)
+        activations.append(config['activation'])
+    np.savez(path, activations=np.array(activations), **arrays)
+
+
+class DenseNet:
+    def __init__(self, layers):
+        # layers: list of (kernel, bias, activation name)
+        self.layers = [(kernel, bias, ACTIVATIONS[activation]) for kernel, bias, activation in layers]
+        self.input_dim = self.layers[0][0].shape[0]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            activations = [str(name) for name in data['activations']]
+            return cls([(data[f'kernel_{i}'], data[f'bias_{i}'], activation)
+                        for i, activation in enumerate(activations)])
+
+    def predict(self, x, verbose=0):
+        # Same contract as keras Model.predict: 2-D batch in, (batch, units) out
+        x = np.asarray(x, dtype=np.float32)
+        for kernel, bias, activation in self.layers:
+            x = x @ kernel
+            x += bias
+            if activation is not None:
+                activation(x)
+        return x
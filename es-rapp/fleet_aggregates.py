@@ -0,0 +1,117 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from decision_engine import ALL_CELLS
+
+
+def parse_power_profiles(value: str):
+    # Comma separated '<cell id or *>=<on W>[:<off W>]', e.g. '*=150:0,1454c001=300:20'
+    profiles = {}
+    for entry in value.split(','):
+        if not entry.strip():
+            continue
+        cell_id, _, watts = entry.partition('=')
+        on_w, _, off_w = watts.partition(':')
+        profiles[cell_id.strip()] = (float(on_w), float(off_w or 0))
+    return profiles
+
+
+class FleetAggregates:
+    # Fleet figures kept up to date as cells are added and change state, as an
+    # observer of the CellStore: cells per state, the current power draw and
+    # the energy used and saved since start. A cell draws the 'on' power of its
+    # profile unless its state is in off_states; baseline_w is drawn by the
+    # site as a whole. Energy is integrated over clock() seconds.
+    def __init__(self, clock, profiles=None, baseline_w: float = 0.0, off_states=()):
+        self.clock = clock
+        self.profiles = profiles or {ALL_CELLS: (0.0, 0.0)}
+        self.baseline_w = baseline_w
+        self.off_states = set(off_states)
+        self.state_counts = {}
+        self.cells = 0
+        self.power_w = baseline_w
+        self.power_all_on_w = baseline_w
+        self.energy_wh = 0.0
+        self.energy_saved_wh = 0.0
+        self.updated_at = None
+
+    def profile(self, cell_id):
+        return self.profiles.get(cell_id) or self.profiles.get(ALL_CELLS, (0.0, 0.0))
+
+    def cell_power(self, cell_id, state):
+        on_w, off_w = self.profile(cell_id)
+        return off_w if state in self.off_states else on_w
+
+    def advance(self):
+        # Accounts the energy used since the last call at the current power draw
+        now = self.clock()
+        if self.updated_at is not None and now > self.updated_at:
+            hours = (now - self.updated_at) / 3600
+            self.energy_wh += self.power_w * hours
+            self.energy_saved_wh += (self.power_all_on_w - self.power_w) * hours
+        self.updated_at = now
+
+    def cell_added(self, cell):
+        self.advance()
+        self.cells += 1
+        self.state_counts[cell.state] = self.state_counts.get(cell.state, 0) + 1
+        self.power_w += self.cell_power(cell.id, cell.state)
+        self.power_all_on_w += self.profile(cell.id)[0]
+
+    def state_changed(self, cell, old_state, new_state):
+        self.advance()
+        self.state_counts[old_state] -= 1
+        self.state_counts[new_state] = self.state_counts.get(new_state, 0) + 1
+        self.power_w += self.cell_power(cell.id, new_state) - self.cell_power(cell.id, old_state)
+
+    def count(self, state):
+        return self.state_counts.get(state, 0)
+
+    def average_prb(self, store, excluded_state):
+        # Sum of the cell averages over the cells not in excluded_state, NaN
+        # while any cell window is still filling
+        cells = self.cells - self.count(excluded_state)
+        if cells == 0:
+            return np.nan
+        return store.total_average() / cells
+
+
+class FleetStatus:
+    # Status line of the rApp, only formatted when the log record is emitted.
+    # At most max_cells cells are listed so the cost does not grow with the fleet.
+    def __init__(self, store, fleet, avg_prb, max_cells: int = 16):
+        self.store = store
+        self.fleet = fleet
+        self.avg_prb = avg_prb
+        self.max_cells = max_cells
+
+    def __str__(self):
+        cells = []
+        for index, cell in enumerate(self.store):
+            if index == self.max_cells:
+                cells.append(f'... {len(self.store) - self.max_cells} more')
+                break
+            cells.append(f'{cell.id}: {cell.avg_prb_usage:.3f}')
+        fleet = self.fleet
+        power_kw = fleet.power_w / 1e3
+        power_all_kw = fleet.power_all_on_w / 1e3
+        return (f'PRB usage: [{", ".join(cells)}] avg: {self.avg_prb:.3f}'
+                f' (energy consumption: {power_kw:.2f}/{power_all_kw:.2f} kW; per day: {24 * power_kw:.2f} kWh;'
+                f' per day savings: {24 * (power_all_kw - power_kw):.2f} kWh;'
+                f' saved since start: {fleet.energy_saved_wh / 1e3:.3f} of {(fleet.energy_wh + fleet.energy_saved_wh) / 1e3:.3f} kWh)')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Forecasts by query, used by es-rapp before asking the load predictor and by
+# the predictor before running the model. Keys are the query rounded to
+# multiples of 'quantum', the model version and the horizon, so a repeated
+# history window (common with steady traffic) is answered from memory. At
+# most max_entries forecasts are kept, least recently used first out, each
+# for at most ttl_sec. Loading another model version invalidates everything.
+
+import threading
+import time
+from collections import OrderedDict
+
+# Response header with the version of the model that made a forecast
+MODEL_VERSION_HEADER = 'X-Model-Version'
+
+
+class ForecastCache:
+    def __init__(self, max_entries=1024, ttl_sec=86400.0, quantum=1.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.quantum = quantum
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def key(self, values, horizon=None, version=None):
+        # version: of the model that gives the forecast, if not the current one
+        return (self.version if version is None else version, horizon) + tuple(int(round(float(v) / self.quantum)) for v in values)
+
+    def get(self, key):
+        # Cached forecast or None
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and (self.ttl_sec <= 0 or self.clock() - entry[0] <= self.ttl_sec):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, forecast):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.entries[key] = (self.clock(), forecast)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def set_version(self, version):
+        # Forecasts of other model versions are dropped; keys made before this
+        # call no longer match
+        with self.lock:
+            if version != self.version:
+                self.version = version
+                self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
+    def stats(self):
+        return {'entries': len(self.entries), 'max_entries': self.max_entries, 'hits': self.hits,
+                'misses': self.misses, 'hit_rate': self.hit_rate(), 'version': self.version}
@@ -0,0 +1,57 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+
+class ForecastPlan:
+    # Multi-step forecast from the load predictor. Like the training windows, step k
+    # of the forecast is the k-th load sample after the query, so the plan is indexed
+    # by the number of samples appended to the history since then, not by decision
+    # cycles. It is followed as long as the latest observed sample stays within
+    # tolerance of what was forecast for it.
+    def __init__(self, tolerance: float):
+        self.tolerance = tolerance
+        self.values = []
+        self.start_sample = None
+
+    def start(self, values, sample):
+        # New forecast queried with the history at sample count 'sample', returns
+        # the value for the next sample
+        self.values = [float(v) for v in values]
+        self.start_sample = sample
+        return self.values[0]
+
+    def next(self, observed, sample):
+        # Forecast for the sample after 'sample', or None if the predictor has to be queried
+        if self.start_sample is None:
+            return None
+        elapsed = sample - self.start_sample
+        if elapsed < 0 or elapsed >= len(self.values):
+            self.clear()
+            return None
+        if elapsed > 0 and abs(observed - self.values[elapsed - 1]) > self.tolerance:
+            self.clear()
+            return None
+        return self.values[elapsed]
+
+    def remaining(self, sample):
+        if self.start_sample is None:
+            return []
+        return self.values[max(0, sample - self.start_sample):]
+
+    def clear(self):
+        self.values = []
+        self.start_sample = None
@@ -0,0 +1,118 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+log = logging.getLogger('main')
+
+# Share of an attempt's time budget given to connecting, the rest is for the response
+CONNECT_SHARE = 0.3
+
+
+def backoff_total(retries: int, backoff_sec: float, backoff_max_sec: float) -> float:
+    # Sum of the sleeps urllib3 makes between attempts; the first retry is immediate
+    return sum(min(backoff_max_sec, backoff_sec * 2 ** (attempt - 1)) for attempt in range(2, retries + 1))
+
+
+class CappedRetry(Retry):
+    # Retry with the backoff sleep capped at max_backoff_sec; urllib3 1.26 has no
+    # backoff_max argument, only a class-wide DEFAULT_BACKOFF_MAX of 120 s
+    def __init__(self, *args, max_backoff_sec: float = Retry.DEFAULT_BACKOFF_MAX, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_backoff_sec = max_backoff_sec
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.max_backoff_sec = self.max_backoff_sec
+        return retry
+
+    def get_backoff_time(self):
+        return min(self.max_backoff_sec, super().get_backoff_time())
+
+
+class EndpointClient:
+    # Keep-alive session towards one endpoint (A1, SDN-C, load predictor) with
+    # default timeout and retries with exponential backoff on connection errors
+    # and 502/503/504 responses. Only idempotent methods are retried, so a POST is
+    # sent once. The per-attempt timeout is shortened where needed so that all
+    # attempts plus the backoff sleeps stay within deadline_sec.
+    def __init__(self, base_url: str, auth=None, timeout_sec: float = 5.0, retries: int = 3,
+                 backoff_sec: float = 0.5, pool_size: int = 8, deadline_sec: float = 20.0):
+        self.base_url = base_url
+        backoff_max_sec = deadline_sec / 4
+        attempt_sec = (deadline_sec - backoff_total(retries, backoff_sec, backoff_max_sec)) / (retries + 1)
+        attempt_sec = min(timeout_sec, attempt_sec)
+        if attempt_sec <= 0:
+            raise ValueError(f'HTTP deadline of {deadline_sec} s leaves no time for {retries + 1} attempts')
+        self.timeout_sec = (attempt_sec * CONNECT_SHARE, attempt_sec * (1 - CONNECT_SHARE))
+        self.session = requests.Session()
+        self.session.auth = auth
+        retry = CappedRetry(total=retries, backoff_factor=backoff_sec, max_backoff_sec=backoff_max_sec,
+                      status_forcelist=(502, 503, 504), allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                      respect_retry_after_header=False, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, path: str = '', **kwargs):
+        kwargs.setdefault('timeout', self.timeout_sec)
+        return self.session.request(method, self.base_url + path, **kwargs)
+
+    def get(self, path: str = '', **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def put(self, path: str = '', **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def post(self, path: str = '', **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path: str = '', **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class RequestRunner:
+    # Issues independent requests (e.g. policy PUTs for several cells) concurrently
+    # on a thread pool, so one slow endpoint only delays its own call. With async
+    # mode off the calls run one after another.
+    def __init__(self, use_async: bool = True, max_workers: int = 8):
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix='http') if use_async else None
+
+    def run(self, calls):
+        # Results in call order; a failed call yields its exception instead of a response
+        if self.executor is None or len(calls) < 2:
+            return [self.call(call) for call in calls]
+        return list(self.executor.map(self.call, calls))
+
+    @staticmethod
+    def call(call):
+        try:
+            return call()
+        except Exception as ex:
+            return ex
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
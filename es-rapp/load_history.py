@@ -0,0 +1,60 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+# Besides the load values, each predictor query carries the time-of-day slot and a trailing 0
+QUERY_FEATURES = 2
+
+
+class LoadHistory:
+    # Fixed-capacity ring of the most recent load values. Every value is written
+    # twice, capacity slots apart, so the latest window is always a contiguous
+    # slice of the buffer and can be handed out without copying.
+    def __init__(self, capacity: int, dtype=np.int64):
+        self.capacity = capacity
+        self.buffer = np.zeros(2 * capacity, dtype=dtype)
+        self.head = 0
+        self.count = 0
+        # Values appended since creation, a clock in load samples for the forecast plan
+        self.appended = 0
+
+    @classmethod
+    def for_look_back(cls, look_back: int):
+        return cls(look_back - QUERY_FEATURES)
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.buffer[self.head] = value
+        self.buffer[self.head + self.capacity] = value
+        self.head = (self.head + 1) % self.capacity
+        self.appended += 1
+        if self.count < self.capacity:
+            self.count += 1
+
+    def window(self):
+        # Read-only view of the stored values, oldest first
+        start = self.head + self.capacity - self.count
+        view = self.buffer[start:self.head + self.capacity]
+        view.flags.writeable = False
+        return view
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
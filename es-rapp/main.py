@@ -17,14 +17,30 @@
 #  !/usr/bin/env python3
 
 import numpy as np
-import requests
 import random
 import logging
 import time
-import json
 import os
+import shutil
 from operator import itemgetter
+from functools import partial
 from enum import Enum
+from report_watcher import ReportWatcher
+from cell_store import CellStore
+from pm_extract import PmSamples, PRB_TOT_DL, NOT_CELL_REPORT, NO_MEASUREMENTS
+from load_history import LoadHistory
+from http_clients import EndpointClient, RequestRunner
+import predictor_protocol
+from forecast_plan import ForecastPlan
+from forecast_cache import ForecastCache, MODEL_VERSION_HEADER
+from decision_engine import DecisionEngine, parse_cell_group
+from policy_registry import PolicyRegistry
+from topology_cache import TopologyCache
+from metrics import PipelineMetrics, MetricsServer
+from prb_store import PrbStore
+from fleet_aggregates import FleetAggregates, FleetStatus, parse_power_profiles
+from report_backlog import BacklogPolicy
+from parallel_ingest import ReportParser
 
 def get_example_per_slice_policy(cell_id: str, qos: int, preference: str):
     ## hardcoded values used for SMaRT-5G demo
@@ -60,6 +76,8 @@ def get_example_per_slice_policy(cell_id: str, qos: int, preference: str):
         ]
     }
 
+POLICIES_PATH = '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies'
+
 log = logging.getLogger('main')
 
 FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
@@ -78,249 +96,475 @@ class Application:
         self.sleep_after_decision_sec = sleep_after_decision_sec
         self.avg_slots = avg_slots
 
-        self.cells = {}
-        self.cell_urls = {}
-        self.ready_time = time.time() + sleep_after_decision_sec
+        # Power draw per cell in W when on and when switched off (DISABLING counts as off), plus
+        # a site baseline. Defaults reproduce 300 W for the first cell and 150 W for every other one.
+        self.fleet = FleetAggregates(clock=lambda: self.clock(),
+                                     profiles=parse_power_profiles(os.environ.get('CELL_POWER_PROFILES', '*=150:0')),
+                                     baseline_w=float(os.environ.get('SITE_BASELINE_POWER_W', '150')),
+                                     off_states=(States.DISABLING, States.DISABLED))
+        self.cells = CellStore(avg_slots, States.ENABLED, observer=self.fleet)
+        self.status_max_cells = int(os.environ.get('STATUS_LOG_MAX_CELLS', '16'))
+        # Wall clock by default, replay.py runs the same pipeline on a virtual clock
+        self.clock = time.time
+        self.ready_time = self.clock() + sleep_after_decision_sec
         self.source_name = ""
         self.meas_entity_dist_name = ""
 
-        self.prb_history = []
-        self.switch_off = False
+        # Only the last look_back values are ever sent to the predictor
+        self.prb_history = LoadHistory.for_look_back(int(os.environ.get('LOAD_PREDICTOR_LOOK_BACK', '8')))
+        # Capacity cells are switched off on low forecast load, coverage cells are always kept on.
+        # DECISION_SCOPE 'fleet' applies the fleet forecast to every cell, 'cell' scales it by each
+        # cell's own load.
+        self.decision_engine = DecisionEngine(
+            off_threshold=float(os.environ.get('DECISION_OFF_THRESHOLD', '80')),
+            on_threshold=float(os.environ.get('DECISION_ON_THRESHOLD', '80')),
+            min_hold_cycles=int(os.environ.get('DECISION_MIN_HOLD_CYCLES', '0')),
+            capacity_cells=parse_cell_group(os.environ.get('CAPACITY_CELLS', '1454c001')),
+            coverage_cells=parse_cell_group(os.environ.get('COVERAGE_CELLS', '')))
+        self.decision_scope = os.environ.get('DECISION_SCOPE', 'fleet')
         self.index = 0
-        self.load_predictor = 'http://' + os.environ['LOAD_PREDICTOR'] + ':' + os.environ['LOAD_PREDICTOR_PORT'] + '/' + os.environ['LOAD_PREDICTOR_API']
+        self.last_prediction = None
+        self.predictor_base_url = 'http://' + os.environ['LOAD_PREDICTOR'] + ':' + os.environ['LOAD_PREDICTOR_PORT']
+        self.predictor_path = '/' + os.environ['LOAD_PREDICTOR_API']
+        self.load_predictor = self.predictor_base_url + self.predictor_path
+        self.predictor_format = predictor_protocol.FORMATS[os.environ.get('LOAD_PREDICTOR_FORMAT', 'json')]
+        # Forecast steps requested per query, one per load sample (PM report) as in training;
+        # planned values are reused while observations stay within LOAD_PREDICTOR_TOLERANCE
+        # of the forecast
+        self.predictor_horizon = int(os.environ.get('LOAD_PREDICTOR_HORIZON', '1'))
+        self.forecast_plan = ForecastPlan(float(os.environ.get('LOAD_PREDICTOR_TOLERANCE', '10')))
+        # Forecasts by history window, time-of-day slot and model version, so repeated windows
+        # are not sent to the predictor again
+        self.forecast_cache = ForecastCache(max_entries=int(os.environ.get('FORECAST_CACHE_SIZE', '1024')),
+                                            ttl_sec=float(os.environ.get('FORECAST_CACHE_TTL_SEC', '86400')),
+                                            quantum=float(os.environ.get('FORECAST_CACHE_QUANTUM', '1')),
+                                            clock=lambda: self.clock())
+        # The model version served by the predictor comes with every forecast; while only
+        # cached forecasts are used, it is checked with GET /ready every FORECAST_CACHE_VERSION_CHECK_SEC
+        self.version_check_sec = float(os.environ.get('FORECAST_CACHE_VERSION_CHECK_SEC', '60'))
+        self.version_checked_at = None
+        if self.predictor_format not in predictor_protocol.supported_types():
+            log.warning(f'{self.predictor_format} is not available, using {predictor_protocol.JSON}')
+            self.predictor_format = predictor_protocol.JSON
 
         self.a1_url = 'http://' + os.environ['A1T_ADDRESS'] + ':' + os.environ['A1T_PORT']
         self.ransim_data_path = os.environ['RANSIM_DATA_PATH']
+        self.ingest_mode = os.environ.get('RANSIM_INGEST_MODE', 'watch')
+        self.watcher = None
+        self.unreadable_reports = set()
+        # Reports queued for longer than REPORT_MAX_AGE_SEC are shed (moved to REPORT_ARCHIVE_PATH if
+        # set), and reports of one source queued for longer than REPORT_COALESCE_LAG_SEC are
+        # merged per REPORT_COALESCE_INTERVAL_SEC
+        self.backlog_policy = BacklogPolicy(max_age_sec=float(os.environ.get('REPORT_MAX_AGE_SEC', '300')),
+                                            interval_sec=float(os.environ.get('REPORT_COALESCE_INTERVAL_SEC', '60')),
+                                            lag_sec=float(os.environ.get('REPORT_COALESCE_LAG_SEC', '60')))
+        self.report_archive_path = os.environ.get('REPORT_ARCHIVE_PATH', '')
+
+        # Additional counters are extracted alongside RRU.PrbTotDl and kept per cell, NaN where a cell lacks one
+        extra_counters = [c.strip() for c in os.environ.get('PM_EXTRA_COUNTERS', '').split(',') if c.strip()]
+        # INGEST_WORKERS > 0 parses reports in that many processes, only the extracted values come back
+        self.parser = ReportParser([PRB_TOT_DL] + extra_counters, workers=int(os.environ.get('INGEST_WORKERS', '0')),
+                                   optional=extra_counters)
+        self.extractor = self.parser.extractor
 
         self.sdn_controller_address = os.environ['SDN_CONTROLLER_ADDRESS']
         self.sdn_controller_port = os.environ['SDN_CONTROLLER_PORT']
         self.sdn_controller_auth = (os.environ['SDN_CONTROLLER_USERNAME'], os.environ['SDN_CONTROLLER_PASSWORD'])
-        
+
+        http_options = dict(timeout_sec=float(os.environ.get('HTTP_TIMEOUT_SEC', '5')),
+                            retries=int(os.environ.get('HTTP_RETRIES', '3')),
+                            backoff_sec=float(os.environ.get('HTTP_BACKOFF_SEC', '0.5')),
+                            deadline_sec=float(os.environ.get('HTTP_DEADLINE_SEC', '20')))
+        self.a1 = EndpointClient(self.a1_url, **http_options)
+        self.sdnc = EndpointClient('http://' + self.sdn_controller_address + ':' + self.sdn_controller_port,
+                                   auth=self.sdn_controller_auth, **http_options)
+        self.predictor = EndpointClient(self.predictor_base_url, **http_options)
+        self.policies = PolicyRegistry(int(os.environ.get('POLICY_ID_BASE', '1000')),
+                                       state_path=os.environ.get('POLICY_REGISTRY_PATH', '/tmp/es-rapp/policies.json'))
+        self.policy_reconcile_sec = float(os.environ.get('POLICY_RECONCILE_SEC', '300'))
+        self.runner = RequestRunner(use_async=os.environ.get('HTTP_ASYNC_MODE', 'true').lower() == 'true')
+        self.topology = TopologyCache(self.sdnc, self.runner,
+                                      managed_elements=os.environ.get('MANAGED_ELEMENTS', '1193046').split(','),
+                                      cache_path=os.environ.get('TOPOLOGY_CACHE_PATH', '/tmp/es-rapp/topology.json'),
+                                      refresh_sec=float(os.environ.get('TOPOLOGY_REFRESH_SEC', '600')))
+        # PRB samples are persisted as they arrive; recent windows are restored at startup
+        # so that decisions can resume without waiting for a full history
+        prb_store_path = os.environ.get('PRB_STORE_PATH', '/tmp/es-rapp/prb-store')
+        self.prb_store = PrbStore(prb_store_path,
+                                  retention_sec=float(os.environ.get('PRB_STORE_RETENTION_DAYS', '90')) * 24 * 3600
+                                  ) if prb_store_path else None
+        self.prb_restore_max_age_sec = float(os.environ.get('PRB_STORE_RESTORE_MAX_AGE_SEC', '600'))
+        self.metrics = PipelineMetrics()
+        self.metrics_port = int(os.environ.get('METRICS_PORT', '9090'))
+        self.metrics_server = None
+
     def work(self):
-        policies = self.get_policies()
-        if policies is None:
+        if self.metrics_port > 0:
+            self.metrics_server = MetricsServer(self.metrics.registry, self.metrics_port)
+
+        if not self.sync_policies():
             log.error('Unable to connect to A1.')
             return
 
-        self.delete_policy()
+        self.delete_policies(self.policies.rapp_policies())
+        self.policies.save()
 
-        self.fetch_cell_urls()
-        if not self.cell_urls:
+        if not self.topology.start():
             log.error('Unable to fetch cell URLs')
             return
 
+        self.restore_history()
+
+        self.watcher = ReportWatcher(self.ransim_data_path, self.sleep_time_sec,
+                                     use_inotify=self.ingest_mode == 'watch')
+
         while True:
-            time.sleep(self.sleep_time_sec)
+            self.watcher.wait(self.sleep_time_sec)
+            self.process_reports()
 
-            data = self.read_data()
-            if not data:
+    def process_reports(self):
+        with self.metrics.stage('cycle').time():
+            reports = self.read_data()
+            if not reports:
                 log.info('No data')
-                continue
+                return
 
-            self.update_local_data(data)
+            update_seconds = self.metrics.stage('update')
+            for data in reports:
+                with update_seconds.time():
+                    self.update_local_data(data)
 
-            if time.time() >= self.ready_time:
-                self.ready_time = time.time() + self.sleep_after_decision_sec
+            now = self.clock()
+            if now >= self.ready_time:
+                self.ready_time = now + self.sleep_after_decision_sec
                 if self.cells:
-                    self.make_decision()
+                    with self.metrics.stage('decision').time():
+                        self.make_decision()
+
+    def close(self):
+        # Parser processes, connections and open files; the application is not used afterwards
+        self.parser.close()
+        self.runner.close()
+        for client in (self.a1, self.sdnc, self.predictor):
+            client.close()
+        if self.prb_store is not None:
+            self.prb_store.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
+    def restore_history(self):
+        if self.prb_store is None:
+            return
+        since = self.clock() - self.prb_restore_max_age_sec
+        for cell_id, values in self.prb_store.recent_cells(since, self.avg_slots):
+            for value in values:
+                self.cells.update(cell_id, float(value))
+        for load in self.prb_store.recent_fleet(since, self.prb_history.capacity):
+            self.prb_history.append(40 if np.isnan(load) else int(load))
+        log.info(f'Restored PRB history of {len(self.cells)} cells and {len(self.prb_history)} fleet samples from {self.prb_store.path}')
 
     def read_data(self):
-        data = None
+        # Drain every pending report in one batch, oldest first
+        reports = []
+        with self.metrics.stage('drain').time():
+            batch = self.watcher.drain()
+        self.metrics.backlog.set(len(batch))
+        parse_seconds = self.metrics.stage('parse')
+        now = self.clock()
+        fresh = []
+        for report, received_sec in batch:
+            if self.backlog_policy.stale(received_sec, now):
+                self.unreadable_reports.discard(report)
+                self.shed_report(report)
+            else:
+                log.debug(f'Opening report file: {report}')
+                fresh.append((report, received_sec))
+        stale = len(batch) - len(fresh)
+        parsed = self.parser.parse([report for report, _ in fresh])
+        for (report, received_sec), (seconds, samples) in zip(fresh, parsed):
+            parse_seconds.observe(seconds)
+            if samples is None:
+                continue
+            if not isinstance(samples, PmSamples):
+                # Give a half-written report one more chance before dropping it
+                if report in self.unreadable_reports:
+                    log.warning(f'Dropping unreadable report {report}: {samples}')
+                    self.metrics.reports.labels('dropped').inc()
+                    self.unreadable_reports.discard(report)
+                    self.remove_report(report)
+                else:
+                    self.metrics.reports.labels('retried').inc()
+                    self.unreadable_reports.add(report)
+                    self.watcher.retry(report, received_sec)
+                continue
+            self.unreadable_reports.discard(report)
+            self.remove_report(report)
+            reports.append((samples, received_sec))
+        reports, merged = self.backlog_policy.coalesce(reports, now)
+        if stale or merged:
+            log.warning(f'Behind on reports: shed {stale} older than {self.backlog_policy.max_age_sec:.0f} s, '
+                        f'merged {merged} into {len(reports)}')
+            self.metrics.reports.labels('stale').inc(stale)
+            self.metrics.reports.labels('coalesced').inc(merged)
+        return reports
+
+    def shed_report(self, report):
+        if not self.report_archive_path:
+            self.remove_report(report)
+            return
         try:
-            reports_list = os.listdir(self.ransim_data_path)
-            reports_list_fullpath = ["{}/{}".format(self.ransim_data_path, report) for report in reports_list]
-            oldest_report = min(reports_list_fullpath, key=os.path.getmtime)
-            log.debug(f'Opening report file: {oldest_report}')
-            with open(oldest_report) as file:
-                data = json.load(file)
-            os.remove(oldest_report)
-        except Exception as ex:
-            pass
-        return data
+            os.makedirs(self.report_archive_path, exist_ok=True)
+            shutil.move(report, os.path.join(self.report_archive_path, os.path.basename(report)))
+        except OSError as ex:
+            log.error(ex)
+
+    def remove_report(self, report):
+        try:
+            os.remove(report)
+        except OSError as ex:
+            log.error(ex)
 
     def update_local_data(self, data):
-        report_type = data['event']['perf3gppFields']['measDataCollection']['measuredEntityDn']
-        if "Cell" not in report_type:
+        # A parsed report, or the PmSamples extracted from it
+        samples = data if isinstance(data, PmSamples) else self.extractor.samples(data)
+        if samples.rejected == NOT_CELL_REPORT:
             log.info('Received report is not a Cell report')
+            self.metrics.reports.labels('rejected').inc()
             return
 
-        self.source_name = data['event']['commonEventHeader']['sourceName']
-        self.meas_entity_dist_name = report_type
-
-        cells = data['event']['perf3gppFields']['measDataCollection']['measInfoList']
+        self.source_name = samples.source_name
+        self.meas_entity_dist_name = samples.meas_entity_dn
 
-        if not cells:
+        if samples.rejected == NO_MEASUREMENTS:
             log.warning("PM report is lacking measurements")
+            self.metrics.reports.labels('rejected').inc()
             return
 
-        for index, cell in enumerate(cells):
-            cId = str(cell['measInfoId']['sMeasInfoId'])
-
-            p = -1
-            types_list = cell['measTypes']['sMeasTypesList']
-            for index_types, pm_type in enumerate(types_list):
-                if pm_type == 'RRU.PrbTotDl':
-                    p = index_types
-                    break
-
-            if p == -1:
-                log.error('PM type RRU.PrbTotDl not present')
-                return
-
-            sValue = cell['measValuesList'][0]['measResults'][p]['sValue']
-
-            if cId not in self.cells:
-                self.cells[cId] = {
-                    "id": cId,
-                    "state": States.ENABLED,
-                    "prb_usage": np.nan * np.zeros((self.avg_slots, )),
-                    "avg_prb_usage": np.nan,
-                    "policy_list": []
-                }
-
-            store = self.cells[cId]
-            store['prb_usage'] = np.roll(store['prb_usage'], 1)
-            store['prb_usage'][0] = float(sValue)
+        counters = self.extractor.counters
+        stored_ids, stored_values = [], []
+        for cId, values in zip(samples.cell_ids, samples.values):
+            store = self.cells.update(cId, values[0])
+            stored_ids.append(cId)
+            stored_values.append(values[0])
+            for index in range(1, len(counters)):
+                store.kpis[counters[index]] = values[index]
+
+        if samples.rejected is not None:
+            log.error(f'PM type {", ".join(samples.missing)} not present')
+            self.metrics.reports.labels('rejected').inc()
+            return
 
-            if not np.isnan(store['prb_usage']).any():
-                store['avg_prb_usage'] = np.mean(store['prb_usage'])
+        self.metrics.reports.labels('processed').inc()
+        self.metrics.cells.set(len(self.cells))
 
-        status = "PRB usage: ["
-        for key in self.cells.keys():
-            cell = self.cells[key]
-            status += f'{cell["id"]}: {cell["avg_prb_usage"]:.3f}, '
-        status = status[:-2] + "] avg: "
-        avg_prb = sum(self.cells[cell]["avg_prb_usage"] for cell in self.cells) / sum((self.cells[cell]['state'] != States.DISABLED) for cell in self.cells)
-        status += f'{avg_prb:.3f}'
+        avg_prb = self.fleet.average_prb(self.cells, States.DISABLED)
+        if self.prb_store is not None:
+            now = self.clock()
+            self.prb_store.append_cells(now, stored_ids, stored_values)
+            self.prb_store.append_fleet(now, np.nan if np.isnan(avg_prb) else int(avg_prb))
         # Maintain history of the prb usage. This is used for querying the model.
         if not np.isnan(avg_prb):
             self.prb_history.append(int(avg_prb))
             log.info(f'New Value {(avg_prb)}')
         else:
             self.prb_history.append(40)
-        energy_all = (300 + 4 * 150) / 1e3
-        energy = (300 + (sum((self.cells[cell]['state'] != States.DISABLED) for cell in self.cells) - 1) * 150) / 1e3
-        energy_per_day = 24 * energy
-        energy_save = (energy_all - energy) * 24
-        status += f' (energy consumption: {energy:.2f}/{energy_all:.2f} W; per day: {energy_per_day:.2f} Wh; per day savings: {energy_save:.2f} Wh)'
-        log.info(status)
+        self.fleet.advance()
+        log.info('%s', FleetStatus(self.cells, self.fleet, avg_prb, self.status_max_cells))
 
     def make_decision(self) :
-        if len(self.prb_history) < 10:
+        if len(self.prb_history) < self.prb_history.capacity:
             log.error("Insufficient data to make a prediction")
             return
 
-        headers = {'Content-Type': 'application/json', 'Accept':'application/json'}
-        l1 = self.prb_history[:]
-        l1.append(self.index%144)
+        slot = self.index % 144
         self.index = self.index + 1
-        l1.append(0)
-        l = json.dumps(l1)
-        rsp = requests.post(self.load_predictor, headers= headers, json=l)
-        r1 = rsp.json()
-        log.info(f'Query - {l1}')
-        prd = 0
-        i = 0
-        self.prb_history = self.prb_history[5:]
-        # Convert the prediction from string to int
-        while True: 
-            if r1[0][i] == " " or r1[0][i] == "." :
-                break
-            prd = prd*10 + int(r1[0][i])
-            i = i+1
+        sample = self.prb_history.appended
+        prd = self.forecast_plan.next(self.prb_history.window()[-1], sample)
+        if prd is None:
+            forecast = self.query_predictor(slot)
+            if forecast is None:
+                return
+            prd = self.forecast_plan.start(forecast, sample)
+            self.metrics.decisions.labels('query').inc()
+        else:
+            log.info(f'Following forecast plan, {len(self.forecast_plan.remaining(sample))} steps left')
+            self.metrics.decisions.labels('plan').inc()
+        prd = int(prd)
+        self.last_prediction = prd
 
         log.info(f'Predicted load - {prd}')
-        # Hardcoding the cell-id here.
-        cell_id = "1454c001"
-        if prd < 80 and self.switch_off == False:
+        with self.metrics.stage('decide').time():
+            to_lock, to_unlock = self.decision_engine.decide(self.cells.ids, self.cell_forecasts(prd))
+        self.metrics.cells_off.set(int(self.decision_engine.locked.sum()))
+        if to_lock or to_unlock:
+            self.sync_policies()
+        # Ids are recorded once for the whole batch before any policy is sent,
+        # so they are cleaned up even if the rApp dies in between
+        policy_ids = {cell_id: [self.policies.allocate(cell_id) for qos in (1, 2)] for cell_id in to_lock}
+        self.policies.save()
+        for cell_id in to_lock:
             #Switch off capacity cell
-            self.cells[cell_id]['state'] = States.DISABLING
-            self.send_command_disable_cell(cell_id)
-            self.switch_off = True
-        elif prd > 80 and self.switch_off == True:
+            self.cells[cell_id].state = States.DISABLING
+            self.send_command_disable_cell(cell_id, policy_ids[cell_id])
+        for cell_id in to_unlock:
             #Switch On capacity cell
-            self.cells[cell_id]['state'] = States.ENABLED
+            self.cells[cell_id].state = States.ENABLED
             self.toggle_cell_administrative_state(cell_id, locked=False)
             self.send_command_enable_cell(cell_id)
-            self.switch_off = False
+        self.policies.save()
+
+    def cell_forecasts(self, prd):
+        if self.decision_scope != 'cell':
+            return prd
+        averages = self.cells.averages()
+        fleet_avg = np.nanmean(averages) if not np.isnan(averages).all() else np.nan
+        if not fleet_avg > 0:
+            return prd
+        return averages * (prd / fleet_avg)
+
+    def query_predictor(self, slot):
+        headers = {'Content-Type': self.predictor_format, 'Accept': self.predictor_format}
+        l1 = self.prb_history.window().tolist()
+        l1.append(slot)
+        l1.append(0)
+        cache = self.forecast_cache
+        # The check may move the cache to a new version, so the key is made after it
+        current = self.cache_is_current()
+        key = cache.key(l1, self.predictor_horizon)
+        forecast = cache.get(key) if current else None
+        if forecast is not None:
+            self.metrics.forecast_cache.labels('hit').inc()
+            log.info(f'Query - {l1} (cached, hit rate {cache.hit_rate():.0%})')
+            return forecast
+        if cache.enabled:
+            self.metrics.forecast_cache.labels('miss').inc()
+        try:
+            with self.metrics.stage('predict').time():
+                rsp = self.predictor.post(self.predictor_path, headers=headers,
+                                          params=dict(horizon=self.predictor_horizon),
+                                          data=predictor_protocol.dumps(l1, self.predictor_format))
+            rsp.raise_for_status()
+            forecast = predictor_protocol.loads(rsp.content, rsp.headers.get('Content-Type', predictor_protocol.JSON).split(';')[0])
+        except Exception as ex:
+            log.error(f'Load predictor query failed: {ex}')
+            self.metrics.predictor_requests.labels('error').inc()
+            return None
+        self.metrics.predictor_requests.labels('ok').inc()
+        log.info(f'Query - {l1}')
+        self.version_checked_at = self.clock()
+        version = rsp.headers.get(MODEL_VERSION_HEADER)
+        if version != cache.version:
+            log.info(f'Load predictor model version {version}')
+            cache.set_version(version)
+            key = cache.key(l1, self.predictor_horizon)
+        cache.put(key, forecast)
+        return forecast
+
+    def cache_is_current(self):
+        # False if the cached forecasts may be from a model the predictor no longer serves
+        cache = self.forecast_cache
+        if not cache.entries:
+            return True
+        now = self.clock()
+        if self.version_checked_at is not None and now - self.version_checked_at < self.version_check_sec:
+            return True
+        try:
+            rsp = self.predictor.get('/ready')
+            rsp.raise_for_status()
+        except Exception as ex:
+            log.warning(f'Load predictor version check failed: {ex}')
+            return False
+        self.version_checked_at = now
+        version = rsp.headers.get(MODEL_VERSION_HEADER)
+        if version != cache.version:
+            log.info(f'Load predictor model version {version}, dropping cached forecasts')
+            cache.set_version(version)
+            return False
+        return True
 
     def toggle_cell_administrative_state(self, cell_id, locked):
         sOff='off' if locked else 'on'
         log.info(f'Switching {sOff} cell {cell_id}')
         path_base = '/O1/CM/'
-        path_tail = self.cell_urls[cell_id]
-        url = 'http://' + self.sdn_controller_address + ':' + self.sdn_controller_port + path_base + path_tail
+        path_tail = self.topology.get(cell_id)
+        if path_tail is None:
+            log.error(f'No SDN-C object instance known for cell {cell_id}')
+            return
         payload = { "attributes": {"administrativeState": "LOCKED" if locked else "UNLOCKED"} }
-        response = requests.put(url, auth=self.sdn_controller_auth, json=payload)
-        log.info(f'Cell-{sOff} response status:{response.status_code}')
+        try:
+            with self.metrics.stage('sdnc').time():
+                response = self.sdnc.put(path_base + path_tail, json=payload)
+            log.info(f'Cell-{sOff} response status:{response.status_code}')
+        except Exception as ex:
+            response = ex
+            log.error(ex)
+        self.metrics.request('sdnc', response)
 
     
     def send_command_enable_cell(self, cell_id):
         log.info(f'Enabling cell with id {cell_id}')
-        self.delete_policy()
-        self.cells[cell_id]['policy_list'] = []
+        self.delete_policies(self.policies.owned_by(cell_id))
+        self.cells[cell_id].policy_list = self.policies.owned_by(cell_id)
 
     
-    def send_command_disable_cell(self, cell_id):
+    def send_command_disable_cell(self, cell_id, ids):
         log.info(f'Disabling cell with id {cell_id}')
-        current_policies = self.get_policies()
-
-        index = 1000
-        while str(index) in current_policies:
-            index += 1
-
-        # put new policy with AVOID based on scope
-        response = requests.put(self.a1_url +
-                                '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies/'
-                                + str(index), params=dict(notification_destination='test'),
-                                json=get_example_per_slice_policy(cell_id, qos=1, preference='FORBID'))
-        log.info(f'Sending policy (id={index}) for cell with id {cell_id} (FORBID): status_code: {response.status_code}')
-        self.cells[cell_id]['policy_list'].append(index)
-
-        index += 1
-        while str(index) in current_policies:
-            index += 1
-        response = requests.put(self.a1_url +
-                                '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies/'
-                                + str(index), params=dict(notification_destination='test'),
-                                json=get_example_per_slice_policy(cell_id, qos=2, preference='FORBID'))
-        log.info(f'Sending policy (id={index}) for cell with id {cell_id} (FORBID): status_code: {response.status_code}')
-        self.cells[cell_id]['policy_list'].append(index)
-
-    def delete_policy(self):
-        log.info(f'Deleting policy with id: {policy_id}')
-        try:
-            requests.delete(self.a1_url +
-                            '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies/1000')
-            requests.delete(self.a1_url +
-                            '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies/1001')
-        except Exception as ex:
-            log.error(ex)
+
+        # put new policies with FORBID based on scope, both are sent at once
+        with self.metrics.stage('a1').time():
+            responses = self.runner.run([partial(self.put_policy, policy_id, cell_id, qos)
+                                         for policy_id, qos in zip(ids, (1, 2))])
+        for policy_id, response in zip(ids, responses):
+            self.metrics.request('a1', response)
+            if isinstance(response, Exception) or response.status_code >= 300:
+                log.error(f'Sending policy (id={policy_id}) for cell with id {cell_id} failed: {getattr(response, "status_code", response)}')
+                self.policies.forget(policy_id)
+                continue
+            log.info(f'Sending policy (id={policy_id}) for cell with id {cell_id} (FORBID): status_code: {response.status_code}')
+            self.cells[cell_id].policy_list.append(policy_id)
+
+    def put_policy(self, policy_id, cell_id, qos):
+        return self.a1.put(POLICIES_PATH + '/' + str(policy_id), params=dict(notification_destination='test'),
+                           json=get_example_per_slice_policy(cell_id, qos=qos, preference='FORBID'))
+
+    def delete_policies(self, policy_ids):
+        if not policy_ids:
+            return
+        log.info(f'Deleting policies with ids: {policy_ids}')
+        with self.metrics.stage('a1').time():
+            responses = self.runner.run([partial(self.a1.delete, POLICIES_PATH + '/' + str(policy_id))
+                                         for policy_id in policy_ids])
+        for policy_id, response in zip(policy_ids, responses):
+            self.metrics.request('a1', response)
+            if isinstance(response, Exception) or (response.status_code >= 300 and response.status_code != 404):
+                log.error(f'Deleting policy (id={policy_id}) failed: {getattr(response, "status_code", response)}')
+                # Kept as owned so that it is deleted again with the cell's other policies
+                self.policies.mark_stale()
+            else:
+                self.policies.release(policy_id)
+
+    def sync_policies(self, force=False):
+        # Mirror A1 state locally; only asks A1 when due or after a failed call
+        now = self.clock()
+        if not force and not self.policies.needs_reconcile(now, self.policy_reconcile_sec):
+            return True
+        policies = self.get_policies()
+        if policies is None:
+            return False
+        self.policies.reconcile(policies, now)
+        return True
 
     def get_policies(self):
         try:
-            response = requests.get(self.a1_url +
-                                    '/A1-P/v2/policytypes/ORAN_TrafficSteeringPreference_2.0.0/policies').json()
-            return response
+            with self.metrics.stage('a1').time():
+                response = self.a1.get(POLICIES_PATH)
         except Exception as ex:
+            self.metrics.request('a1', ex)
             log.error(ex)
             return None
-
-    def fetch_cell_urls(self):
-        ## TBUpdated: fetch managedelement id instead of hardcoded value
-        path_base = '/O1/CM/ManagedElement=1193046'
-        url = 'http://' + self.sdn_controller_address + ':' + self.sdn_controller_port + path_base
+        self.metrics.request('a1', response)
         try:
-            response = requests.get(url, auth=self.sdn_controller_auth).json()
-            gnb_du_function = response['GnbDuFunction']
-
-            for data in gnb_du_function:
-                for cell_du in data['NrCellDu']:
-                    cell_name = cell_du['viavi-attributes']['cellName']
-                    url = cell_du['objectInstance']
-                    self.cell_urls[cell_name] = url
-
-            return response
+            return response.json()
         except Exception as ex:
             log.error(ex)
             return None
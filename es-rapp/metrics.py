@@ -0,0 +1,229 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger('main')
+
+# Upper bounds in seconds, from directory listings to slow HTTP calls
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class CounterValue:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+
+class GaugeValue(CounterValue):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+
+class HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def time(self):
+        return Timer(self)
+
+
+class Timer:
+    # with histogram.time(): ... observes the elapsed seconds
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Metric:
+    # One metric family. Values per label combination are created on first use
+    # and kept, so hot paths can hold on to them.
+    def __init__(self, kind, name, documentation, labelnames, value_factory):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.value_factory = value_factory
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *labelvalues):
+        value = self.values.get(labelvalues)
+        if value is None:
+            with self.lock:
+                value = self.values.setdefault(labelvalues, self.value_factory())
+        return value
+
+    def __getattr__(self, name):
+        # Metrics without labels are used directly, e.g. counter.inc()
+        if name in ('inc', 'set', 'observe', 'time', 'value') and not self.labelnames:
+            return getattr(self.labels(), name)
+        raise AttributeError(name)
+
+    def items(self):
+        # Taken under the lock, as labels() may add values from other threads meanwhile
+        with self.lock:
+            return sorted(self.values.items())
+
+    def label_string(self, labelvalues, extra=()):
+        pairs = list(zip(self.labelnames, labelvalues)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labelvalues, value in self.items():
+            if self.kind != 'histogram':
+                lines.append(f'{self.name}{self.label_string(labelvalues)} {value.value}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(value.bounds) + ['+Inf'], value.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{self.label_string(labelvalues, [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{self.label_string(labelvalues)} {value.sum}')
+            lines.append(f'{self.name}_count{self.label_string(labelvalues)} {value.count}')
+        return lines
+
+    def snapshot(self):
+        result = {}
+        for labelvalues, value in self.items():
+            key = ','.join(f'{name}={label}' for name, label in zip(self.labelnames, labelvalues))
+            if self.kind == 'histogram':
+                result[key] = {'count': value.count, 'sum': value.sum,
+                               'mean': value.sum / value.count if value.count else None}
+            else:
+                result[key] = value.value
+        return result
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.add(Metric('counter', name, documentation, labelnames, CounterValue))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.add(Metric('gauge', name, documentation, labelnames, GaugeValue))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        bounds = tuple(sorted(buckets))
+        return self.add(Metric('histogram', name, documentation, labelnames, lambda: HistogramValue(bounds)))
+
+    def render(self):
+        # Prometheus text exposition format
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        # Plain dict for replay and benchmark results
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+
+class PipelineMetrics:
+    # The metrics of the rApp pipeline. Stages: drain, parse, update, decision,
+    # predict, decide, a1 and sdnc, plus cycle for a whole round of reports.
+    def __init__(self, registry=None):
+        self.registry = registry or Registry()
+        r = self.registry
+        self.stage_seconds = r.histogram('es_rapp_stage_seconds', 'Time spent per pipeline stage', ['stage'])
+        self.reports = r.counter('es_rapp_reports_total', 'PM reports by outcome (processed, rejected, retried, dropped, stale, coalesced)', ['result'])
+        self.backlog = r.gauge('es_rapp_report_backlog', 'Reports pending in RANSIM_DATA_PATH when the last batch was drained')
+        self.cells = r.gauge('es_rapp_cells', 'Cells tracked by the rApp')
+        self.cells_off = r.gauge('es_rapp_cells_switched_off', 'Cells currently switched off by the rApp')
+        self.decisions = r.counter('es_rapp_decisions_total', 'Decision cycles by forecast source (query, plan)', ['source'])
+        self.predictor_requests = r.counter('es_rapp_predictor_requests_total', 'Load predictor queries by outcome', ['result'])
+        self.forecast_cache = r.counter('es_rapp_forecast_cache_total', 'Forecast cache lookups by result (hit, miss)', ['result'])
+        self.http_requests = r.counter('es_rapp_http_requests_total', 'A1 and SDN-C requests by outcome', ['endpoint', 'result'])
+
+    def stage(self, name):
+        return self.stage_seconds.labels(name)
+
+    def request(self, endpoint, response):
+        # Counts a response or the exception raised in its place
+        if isinstance(response, Exception):
+            result = 'error'
+        else:
+            result = 'ok' if response.status_code < 400 else str(response.status_code)
+        self.http_requests.labels(endpoint, result).inc()
+
+
+class MetricsServer:
+    # Serves registry.render() on GET /metrics from a daemon thread
+    def __init__(self, registry, port: int, host: str = '0.0.0.0'):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, name='metrics', daemon=True).start()
+        log.info(f'Serving metrics on {host}:{self.port}/metrics')
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
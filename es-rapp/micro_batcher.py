@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Coalesces concurrent single-window predictions into one model call. Request
+# threads submit a window and wait; a worker thread collects up to
+# max_batch_size windows, waiting at most max_wait_ms after the first one, and
+# runs them through predict_fn as one batch. Every window can carry a tag (e.g.
+# the model the request started with) that is passed on to predict_fn; windows
+# with different tags are never predicted together.
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=32, max_wait_ms=1.0):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_ms / 1000
+        self.requests = queue.SimpleQueue()
+        self.batches = 0
+        self.batched_windows = 0
+        self.worker = threading.Thread(target=self.run, name='micro-batcher', daemon=True)
+        self.worker.start()
+
+    def submit(self, window, tag=None) -> Future:
+        future = Future()
+        self.requests.put((window, tag, future))
+        return future
+
+    def predict(self, window, tag=None, timeout=None):
+        # Model output row for one window
+        return self.submit(window, tag).result(timeout)
+
+    def collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait_sec
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            self.batches += 1
+            self.batched_windows += len(batch)
+            groups = {}
+            for request in batch:
+                groups.setdefault(id(request[1]), []).append(request)
+            for group in groups.values():
+                self.predict_group(group)
+
+    def predict_group(self, group):
+        tag = group[0][1]
+        try:
+            results = self.predict_fn(np.array([window for window, _, _ in group], dtype=np.float32), tag)
+        except Exception:
+            # Malformed windows cannot be stacked; isolate them by predicting one by one
+            for window, _, future in group:
+                try:
+                    future.set_result(self.predict_fn(np.array([window], dtype=np.float32), tag)[0])
+                except Exception as ex:
+                    future.set_exception(ex)
+            return
+        for (_, _, future), result in zip(group, results):
+            future.set_result(result)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Versioned on-disk model artifacts shared by the offline trainer and the
+# predictor service. Layout:
+#   <model_dir>/<version>/model.keras
+#   <model_dir>/<version>/metadata.json
+#   <model_dir>/<version>/weights.npz   Dense weights for the NumPy engine
+#   <model_dir>/LATEST            name of the version served by default
+#   <model_dir>/HISTORY           versions made LATEST, one per line, oldest first
+
+import json
+import os
+from datetime import datetime, timezone
+
+import dnn_engine
+
+MODEL_FILE = 'model.keras'
+WEIGHTS_FILE = 'weights.npz'
+METADATA_FILE = 'metadata.json'
+LATEST_FILE = 'LATEST'
+HISTORY_FILE = 'HISTORY'
+
+
+def new_version(model_dir):
+    version = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    candidate, n = version, 1
+    while os.path.exists(os.path.join(model_dir, candidate)):
+        candidate = f'{version}-{n}'
+        n += 1
+    return candidate
+
+
+def save(model, model_dir, metadata, version=None, make_latest=True):
+    os.makedirs(model_dir, exist_ok=True)
+    version = version or new_version(model_dir)
+    path = os.path.join(model_dir, version)
+    # Written under a temporary name first so a half-saved artifact is never picked up
+    tmp_path = path + '.tmp'
+    os.makedirs(tmp_path)
+    model.save(os.path.join(tmp_path, MODEL_FILE))
+    dnn_engine.export_weights(model, os.path.join(tmp_path, WEIGHTS_FILE))
+    with open(os.path.join(tmp_path, METADATA_FILE), 'w') as file:
+        json.dump(dict(metadata, version=version), file, indent=1)
+    os.rename(tmp_path, path)
+    if make_latest:
+        set_latest(model_dir, version)
+    return version
+
+
+def set_latest(model_dir, version):
+    # Artifacts from before the history was kept start it with their latest version
+    previous = latest_version(model_dir)
+    history = promotion_history(model_dir) or ([previous] if previous else [])
+    write_file(model_dir, LATEST_FILE, version)
+    if not history or history[-1] != version:
+        write_file(model_dir, HISTORY_FILE, '\n'.join(history + [version]) + '\n')
+
+
+def write_file(model_dir, name, content):
+    # Replaced atomically, readers see the old or the new content
+    tmp_file = os.path.join(model_dir, name + '.tmp')
+    with open(tmp_file, 'w') as file:
+        file.write(content)
+    os.replace(tmp_file, os.path.join(model_dir, name))
+
+
+def promotion_history(model_dir):
+    try:
+        with open(os.path.join(model_dir, HISTORY_FILE)) as file:
+            return [line.strip() for line in file if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def rollback(model_dir):
+    # Makes the version served before the latest one the latest again and
+    # returns it. Repeated rollbacks walk further back.
+    history = promotion_history(model_dir)
+    current = latest_version(model_dir)
+    while history and history[-1] == current:
+        history.pop()
+    if not history:
+        raise ValueError(f'No earlier model version to roll back to in {model_dir}')
+    write_file(model_dir, HISTORY_FILE, '\n'.join(history) + '\n')
+    write_file(model_dir, LATEST_FILE, history[-1])
+    return history[-1]
+
+
+def latest_version(model_dir):
+    try:
+        with open(os.path.join(model_dir, LATEST_FILE)) as file:
+            return file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(model_dir):
+    try:
+        return sorted(name for name in os.listdir(model_dir)
+                      if os.path.isfile(os.path.join(model_dir, name, METADATA_FILE)))
+    except FileNotFoundError:
+        return []
+
+
+def load_metadata(model_dir, version):
+    with open(os.path.join(model_dir, version, METADATA_FILE)) as file:
+        return json.load(file)
+
+
+def load(model_dir, version=None, engine='keras'):
+    # engine 'numpy' returns a dnn_engine.DenseNet and does not need TensorFlow
+    version = version or latest_version(model_dir)
+    if version is None:
+        raise FileNotFoundError(f'No model artifact in {model_dir}')
+
+    path = os.path.join(model_dir, version)
+    if engine == 'numpy':
+        if not os.path.exists(os.path.join(path, WEIGHTS_FILE)):
+            export_weights(model_dir, version)
+        model = dnn_engine.DenseNet.load(os.path.join(path, WEIGHTS_FILE))
+    else:
+        # Keras is only needed once an artifact is actually loaded
+        from keras.models import load_model
+        model = load_model(os.path.join(path, MODEL_FILE))
+    return model, load_metadata(model_dir, version)
+
+
+def export_weights(model_dir, version):
+    # For artifacts saved before the weights were exported alongside the model
+    from keras.models import load_model
+    path = os.path.join(model_dir, version)
+    tmp_file = os.path.join(path, 'weights.tmp.npz')
+    dnn_engine.export_weights(load_model(os.path.join(path, MODEL_FILE)), tmp_file)
+    os.replace(tmp_file, os.path.join(path, WEIGHTS_FILE))
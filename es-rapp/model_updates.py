@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Background model updates of the predictor service. The Retrainer runs
+# incremental training (train_model.py --incremental) in a separate process at
+# low CPU priority, which makes a candidate the latest artifact only if it
+# forecasts the recent load as well as the served model. The ModelWatcher in
+# every worker notices a new latest artifact (or a rollback) and hands it to
+# a swap function, so requests are never held up by training or loading.
+
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+import model_artifacts
+
+log = logging.getLogger('predictor')
+
+
+def train_model_command(*args):
+    return [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'train_model.py'), *args]
+
+
+def train_first_model(data_path, model_dir):
+    # Trains the first artifact in a child process and makes it the latest one.
+    # TensorFlow is only imported there, so the caller can still fork safely.
+    command = train_model_command('--data', data_path, '--model-dir', model_dir)
+    log.info('Training: %s', ' '.join(command))
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'Training failed with status {result.returncode}: {(result.stderr or "").strip()[-2000:]}')
+    return model_artifacts.latest_version(model_dir)
+
+
+class ModelWatcher:
+    # Calls swap(version) from a daemon thread whenever the latest version in
+    # model_dir differs from current()
+    def __init__(self, model_dir, current, swap, interval_sec: float = 30.0):
+        self.model_dir = model_dir
+        self.current = current
+        self.swap = swap
+        self.interval_sec = interval_sec
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='model-watcher', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_sec):
+            self.check()
+
+    def check(self):
+        latest = model_artifacts.latest_version(self.model_dir)
+        if latest is None or latest == self.current():
+            return
+        try:
+            self.swap(latest)
+        except Exception:
+            log.exception('Unable to serve model version %s', latest)
+
+    def stop(self):
+        self.stopped.set()
+
+
+class Retrainer:
+    # Runs train_model.py --incremental every interval_sec from a daemon thread,
+    # or with start=False from whoever calls run()
+    def __init__(self, data_path, model_dir, interval_sec: float = 3600.0, args=(), nice: int = 10,
+                 start: bool = True):
+        self.command = train_model_command('--incremental', '--data', data_path, '--model-dir', model_dir, *args)
+        self.interval_sec = interval_sec
+        self.nice = nice
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='retrainer', daemon=True)
+        if start:
+            self.thread.start()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_sec):
+            self.retrain()
+
+    def retrain(self):
+        log.info('Retraining: %s', ' '.join(self.command))
+        try:
+            result = subprocess.run(self.command, capture_output=True, text=True,
+                                    preexec_fn=lambda: os.nice(self.nice))
+        except OSError:
+            log.exception('Unable to start retraining')
+            return
+        lines = (result.stdout or '').strip().splitlines()
+        if result.returncode == 0:
+            log.info('Retraining finished: %s', lines[-1] if lines else '')
+        else:
+            log.error('Retraining failed with status %d: %s', result.returncode, (result.stderr or '').strip()[-2000:])
+
+    def stop(self):
+        self.stopped.set()
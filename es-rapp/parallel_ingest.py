@@ -0,0 +1,91 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pm_extract import PmExtractor, load_report
+
+# Chunks per worker and batch, so that uneven report sizes even out
+CHUNKS_PER_WORKER = 4
+
+# Extractor of a worker process, its counter layouts are cached across batches
+extractor = None
+
+
+class ParseFailure:
+    # Why a report could not be parsed; exceptions do not always survive pickling
+    __slots__ = ('message',)
+
+    def __init__(self, message: str):
+        self.message = message
+
+    def __str__(self):
+        return self.message
+
+
+def parse_report(report_extractor, path):
+    # (seconds, result) with PmSamples, None if the file is gone, or a ParseFailure
+    started = time.perf_counter()
+    try:
+        result = report_extractor.samples(load_report(path))
+    except FileNotFoundError:
+        result = None
+    except Exception as ex:
+        result = ParseFailure(str(ex))
+    return time.perf_counter() - started, result
+
+
+def init_worker(counters, optional):
+    global extractor
+    extractor = PmExtractor(counters, optional)
+
+
+def parse_chunk(paths):
+    return [parse_report(extractor, path) for path in paths]
+
+
+class ReportParser:
+    # Reads report files into PmSamples. With workers > 0 the files of a batch
+    # are parsed by a pool of processes, in chunks of consecutive files, and
+    # only the compact samples are sent back. Results are always returned in
+    # the order of the files, so what the rApp does with them does not depend
+    # on the number of workers.
+    def __init__(self, counters, workers: int = 0, optional=()):
+        self.extractor = PmExtractor(counters, optional)
+        self.workers = workers
+        self.pool = None
+
+    def parse(self, paths):
+        if self.workers <= 0 or len(paths) < 2:
+            return [parse_report(self.extractor, path) for path in paths]
+        if self.pool is None:
+            # Workers are started fresh, the rApp process has threads that must not be forked
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                            initializer=init_worker, initargs=(self.extractor.counters, self.extractor.optional))
+        size = math.ceil(len(paths) / (self.workers * CHUNKS_PER_WORKER))
+        results = []
+        for chunk in self.pool.map(parse_chunk, [paths[i:i + size] for i in range(0, len(paths), size)]):
+            results.extend(chunk)
+        return results
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,146 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import math
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+PRB_TOT_DL = 'RRU.PrbTotDl'
+
+# Upper bound on remembered counter layouts, in practice there are only a few
+MAX_LAYOUTS = 1024
+# Layouts tried per (sourceName, measuredEntityDn, number of types) before resolving again
+MAX_LAYOUTS_PER_KEY = 4
+
+
+def load_report(path: str):
+    with open(path, 'rb') as file:
+        return loads(file.read())
+
+
+class PmExtractor:
+    # Pulls a fixed list of counters out of measInfoList entries. The position of
+    # each counter in measTypes is resolved once and remembered per (sourceName,
+    # measuredEntityDn, number of measTypes); a remembered layout is reused as
+    # long as the counters are still found at its positions, which is checked
+    # without walking or hashing the whole list. Optional counters that a cell
+    # does not report come out as NaN; a missing required counter rejects it.
+    def __init__(self, counters=(PRB_TOT_DL,), optional=()):
+        self.counters = tuple(counters)
+        self.optional = frozenset(optional)
+        self.layouts = {}
+
+    def resolve(self, types_list):
+        positions = {pm_type: index for index, pm_type in reversed(list(enumerate(types_list)))}
+        return tuple(positions.get(counter, -1) for counter in self.counters)
+
+    def matches(self, indices, types_list):
+        # True if the layout holds for types_list: every counter at its position,
+        # absent counters still absent (only checked when there are any)
+        for counter, index in zip(self.counters, indices):
+            if index >= 0 and types_list[index] != counter:
+                return False
+        return -1 not in indices or all(counter not in types_list
+                                        for counter, index in zip(self.counters, indices) if index < 0)
+
+    def layout(self, source_name: str, meas_entity_dn: str, types_list):
+        key = (source_name, meas_entity_dn, len(types_list))
+        candidates = self.layouts.get(key)
+        if candidates is None:
+            if len(self.layouts) >= MAX_LAYOUTS:
+                self.layouts.clear()
+            candidates = self.layouts[key] = []
+        for indices in candidates:
+            if self.matches(indices, types_list):
+                return indices
+        indices = self.resolve(types_list)
+        candidates.insert(0, indices)
+        del candidates[MAX_LAYOUTS_PER_KEY:]
+        return indices
+
+    def values(self, source_name: str, meas_entity_dn: str, meas_info):
+        # Values of all configured counters for one measInfo entry, NaN for absent
+        # optional counters, or None if a required counter is missing
+        indices = self.layout(source_name, meas_entity_dn, meas_info['measTypes']['sMeasTypesList'])
+        results = meas_info['measValuesList'][0]['measResults']
+        if -1 not in indices:
+            return [float(results[p]['sValue']) for p in indices]
+        values = []
+        for counter, p in zip(self.counters, indices):
+            if p >= 0:
+                values.append(float(results[p]['sValue']))
+            elif counter in self.optional:
+                values.append(math.nan)
+            else:
+                return None
+        return values
+
+    def missing(self, meas_info):
+        # Required counters the entry lacks
+        types_list = meas_info['measTypes']['sMeasTypesList']
+        return [counter for counter in self.counters if counter not in types_list and counter not in self.optional]
+
+    def samples(self, data):
+        # Compact PmSamples of a parsed report
+        collection = data['event']['perf3gppFields']['measDataCollection']
+        meas_entity_dn = collection['measuredEntityDn']
+        header = data['event']['commonEventHeader']
+        samples = PmSamples(header.get('sourceName', ''), meas_entity_dn, (header.get('lastEpochMicrosec') or 0) / 1e6)
+        if 'Cell' not in meas_entity_dn:
+            samples.rejected = NOT_CELL_REPORT
+            return samples
+        cells = collection['measInfoList']
+        if not cells:
+            samples.rejected = NO_MEASUREMENTS
+            return samples
+        for cell in cells:
+            values = self.values(samples.source_name, meas_entity_dn, cell)
+            if values is None:
+                samples.rejected = MISSING_COUNTERS
+                samples.missing = self.missing(cell)
+                break
+            samples.cell_ids.append(str(cell['measInfoId']['sMeasInfoId']))
+            samples.values.append(values)
+        return samples
+
+
+NOT_CELL_REPORT = 'not a cell report'
+NO_MEASUREMENTS = 'no measurements'
+MISSING_COUNTERS = 'missing counters'
+
+
+class PmSamples:
+    # What the rApp keeps of one report: the configured counters of each cell,
+    # in report order. A rejected report tells why; with missing counters the
+    # cells before the incomplete one are kept. Cheap to pickle, so parsing can
+    # happen in another process.
+    __slots__ = ('source_name', 'meas_entity_dn', 'epoch_sec', 'cell_ids', 'values', 'rejected', 'missing')
+
+    def __init__(self, source_name: str, meas_entity_dn: str, epoch_sec: float = 0.0, cell_ids=None, values=None):
+        self.source_name = source_name
+        self.meas_entity_dn = meas_entity_dn
+        # End of the collection interval, 0 if the report does not say
+        self.epoch_sec = epoch_sec
+        self.cell_ids = cell_ids if cell_ids is not None else []
+        self.values = values if values is not None else []
+        self.rejected = None
+        self.missing = ()
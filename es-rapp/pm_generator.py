@@ -0,0 +1,144 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+# Synthetic PM reports in the layout the rApp reads from RANSIM_DATA_PATH, for
+# benchmarks, replays and load tests, e.g.
+#   python pm_generator.py /tmp/reports --cells 100 --count 8640
+#   python pm_generator.py $RANSIM_DATA_PATH --cells 20 --rate 0.1
+
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+DEFAULT_COUNTERS = ('RRU.PrbTotDl', 'RRU.PrbTotUl', 'DRB.UEThpDl', 'DRB.UEThpUl')
+DAY_SEC = 24 * 3600
+
+
+def cell_ids(count: int, source_name: str = '1454'):
+    return [f'{source_name}c{index:03d}' for index in range(1, count + 1)]
+
+
+class ReportGenerator:
+    # Produces one report per call with a measInfo entry per cell. The load of
+    # every cell follows a daily curve with its own peak level and phase plus
+    # noise, all derived from seed so the same arguments give the same reports.
+    def __init__(self, cells: int = 4, counters=DEFAULT_COUNTERS, source_name: str = '1454',
+                 granularity_sec: int = 900, interval_sec: float = 10.0, start_epoch_sec: float = 0.0,
+                 seed: int = 0):
+        self.cell_ids = cell_ids(cells, source_name)
+        self.counters = list(counters)
+        self.source_name = source_name
+        self.granularity_sec = granularity_sec
+        self.interval_sec = interval_sec
+        self.start_epoch_sec = start_epoch_sec
+        self.sequence = 0
+        self.rng = np.random.default_rng(seed)
+        self.peak = self.rng.uniform(50, 95, cells)
+        self.phase = self.rng.uniform(-0.1, 0.1, cells) * DAY_SEC
+
+    def loads(self, epoch_sec: float):
+        # PRB usage in percent per cell
+        daily = 0.5 - 0.5 * np.cos(2 * math.pi * (epoch_sec + self.phase) / DAY_SEC)
+        noise = self.rng.normal(0, 3, len(self.cell_ids))
+        return np.clip(10 + (self.peak - 10) * daily + noise, 0, 100)
+
+    def counter_values(self, load):
+        # One row of counter values per cell, PRB counters follow the load and the
+        # others are scaled from it
+        values = np.empty((len(load), len(self.counters)))
+        for column, counter in enumerate(self.counters):
+            if counter.startswith('RRU.Prb'):
+                values[:, column] = load if counter.endswith('Dl') else load * 0.4
+            else:
+                values[:, column] = load * 1000
+        return np.rint(values).astype(np.int64)
+
+    def report(self):
+        epoch_sec = self.start_epoch_sec + self.sequence * self.interval_sec
+        self.sequence += 1
+        values = self.counter_values(self.loads(epoch_sec))
+        meas_types = {'sMeasTypesList': self.counters}
+        meas_info_list = [{
+            'measInfoId': {'sMeasInfoId': cell_id},
+            'measTypes': meas_types,
+            'measValuesList': [{
+                'measObjInstId': cell_id,
+                'suspectFlag': 'false',
+                'measResults': [{'p': p, 'sValue': str(value)} for p, value in enumerate(row.tolist(), start=1)],
+            }],
+        } for cell_id, row in zip(self.cell_ids, values)]
+        return {
+            'event': {
+                'commonEventHeader': {
+                    'domain': 'perf3gpp',
+                    'eventName': 'perf3gpp_gnb-Viavi_pmMeasResult',
+                    'sourceName': self.source_name,
+                    'reportingEntityName': '',
+                    'startEpochMicrosec': int((epoch_sec - self.interval_sec) * 1e6),
+                    'lastEpochMicrosec': int(epoch_sec * 1e6),
+                    'timeZoneOffset': '+00:00',
+                },
+                'perf3gppFields': {
+                    'perf3gppFieldsVersion': '1.0',
+                    'measDataCollection': {
+                        'granularityPeriod': self.granularity_sec,
+                        'measuredEntityUserName': '',
+                        'measuredEntityDn': f'ManagedElement={self.source_name},NRCellDU',
+                        'measuredEntitySoftwareVersion': '',
+                        'measInfoList': meas_info_list,
+                    },
+                },
+            },
+        }
+
+    def write(self, directory: str):
+        # Written under a temporary name and renamed, like a finished upload
+        name = f'A{self.sequence:08d}_{self.source_name}.json'
+        tmp_path = os.path.join(directory, '.' + name)
+        with open(tmp_path, 'w') as file:
+            json.dump(self.report(), file)
+        path = os.path.join(directory, name)
+        os.replace(tmp_path, path)
+        return path
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write synthetic PM reports')
+    parser.add_argument('directory')
+    parser.add_argument('--cells', type=int, default=4)
+    parser.add_argument('--counters', default=','.join(DEFAULT_COUNTERS), help='Comma separated PM counters per cell')
+    parser.add_argument('--count', type=int, default=100, help='Number of reports, 0 to keep writing')
+    parser.add_argument('--rate', type=float, default=0, help='Reports per second of wall time, 0 writes them all at once')
+    parser.add_argument('--interval-sec', type=float, default=10.0, help='Measurement time between two reports')
+    parser.add_argument('--source-name', default='1454')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.directory, exist_ok=True)
+    generator = ReportGenerator(args.cells, [c.strip() for c in args.counters.split(',') if c.strip()],
+                                args.source_name, interval_sec=args.interval_sec, seed=args.seed)
+    next_time = time.monotonic()
+    while args.count == 0 or generator.sequence < args.count:
+        generator.write(args.directory)
+        if args.rate > 0:
+            next_time += 1 / args.rate
+            time.sleep(max(0.0, next_time - time.monotonic()))
+    print(f'Wrote {generator.sequence} reports with {args.cells} cells to {args.directory}')
@@ -0,0 +1,137 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import logging
+import os
+
+log = logging.getLogger('main')
+
+
+class PolicyRegistry:
+    # In-process mirror of the A1 policies of the traffic steering policy type.
+    # Ids from id_base upwards are handed out by this rApp: released ids are
+    # reused first, otherwise the id after the highest one in use is taken, so
+    # allocation is O(1). The mirror is rebuilt from the A1 policy list by
+    # reconcile(), periodically and whenever an A1 call has failed.
+    # Ids created by this rApp and not yet known to be deleted are persisted to
+    # state_path by save(), so a restart cleans up its own leftovers and nothing
+    # else. The caller saves once per batch of allocations, before sending them.
+    def __init__(self, id_base: int = 1000, state_path: str = ''):
+        self.id_base = id_base
+        self.state_path = state_path
+        self.owners = {}
+        self.cell_policies = {}
+        self.own_ids = set()
+        self.unsaved = False
+        self.free_ids = []
+        self.next_id = id_base
+        self.stale = True
+        self.synced_at = None
+        self.load()
+
+    def reconcile(self, policy_ids, now: float):
+        ids = {int(policy_id) for policy_id in policy_ids if str(policy_id).isdigit()}
+        # Ownership is only known for policies created since start
+        self.owners = {policy_id: self.owners.get(policy_id) for policy_id in ids}
+        self.cell_policies = {}
+        for policy_id, cell_id in self.owners.items():
+            if cell_id is not None:
+                self.cell_policies.setdefault(cell_id, set()).add(policy_id)
+        self.next_id = max([self.id_base] + [policy_id + 1 for policy_id in ids if policy_id >= self.id_base])
+        # Stack of unused ids below next_id, lowest on top
+        self.free_ids = [policy_id for policy_id in range(self.next_id - 1, self.id_base - 1, -1) if policy_id not in ids]
+        if not self.own_ids <= ids:
+            self.own_ids &= ids
+            self.unsaved = True
+        self.save()
+        self.stale = False
+        self.synced_at = now
+
+    def needs_reconcile(self, now: float, interval_sec: float):
+        return self.stale or self.synced_at is None or now - self.synced_at >= interval_sec
+
+    def allocate(self, cell_id: str) -> int:
+        policy_id = self.free_ids.pop() if self.free_ids else None
+        if policy_id is None:
+            policy_id = self.next_id
+            self.next_id += 1
+        self.owners[policy_id] = cell_id
+        self.cell_policies.setdefault(cell_id, set()).add(policy_id)
+        self.own_ids.add(policy_id)
+        self.unsaved = True
+        return policy_id
+
+    def release(self, policy_id: int):
+        # Policy is known to be gone from A1
+        self.disown(policy_id)
+        if policy_id >= self.id_base:
+            self.free_ids.append(policy_id)
+        if policy_id in self.own_ids:
+            self.own_ids.discard(policy_id)
+            self.unsaved = True
+
+    def forget(self, policy_id: int):
+        # Outcome of an A1 call is unknown, A1 has to be asked again. The id stays
+        # in own_ids until A1 no longer lists it.
+        self.disown(policy_id)
+        self.stale = True
+
+    def disown(self, policy_id: int):
+        cell_id = self.owners.pop(policy_id, None)
+        policy_ids = self.cell_policies.get(cell_id)
+        if policy_ids is not None:
+            policy_ids.discard(policy_id)
+            if not policy_ids:
+                del self.cell_policies[cell_id]
+
+    def mark_stale(self):
+        self.stale = True
+
+    def owned_by(self, cell_id: str):
+        return sorted(self.cell_policies.get(cell_id, ()))
+
+    def rapp_policies(self):
+        # Policies created by this rApp, including ones left over from an earlier run
+        return sorted(self.own_ids)
+
+    def load(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path) as file:
+                self.own_ids = {int(policy_id) for policy_id in json.load(file).get('policy_ids', [])}
+        except FileNotFoundError:
+            return
+        except Exception as ex:
+            log.warning(f'Ignoring unreadable policy registry {self.state_path}: {ex}')
+            return
+        log.info(f'Loaded {len(self.own_ids)} policy ids from policy registry {self.state_path}')
+
+    def save(self):
+        # Writes the own ids if they changed since the last save
+        if not self.state_path or not self.unsaved:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump({'policy_ids': sorted(self.own_ids)}, file)
+            os.replace(tmp_path, self.state_path)
+            self.unsaved = False
+        except OSError as ex:
+            log.warning(f'Unable to write policy registry {self.state_path}: {ex}')
@@ -0,0 +1,198 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+SEGMENT_ROWS = 1 << 20
+
+
+class ColumnTable:
+    # Append-only table with one raw little-endian file per column, split into
+    # numbered segment directories of at most segment_rows rows. Columns are
+    # read back through np.memmap. After a crash the writer cuts the columns
+    # of the last segment back to the length they all have. A read-only table
+    # can be opened while another process appends to it.
+    def __init__(self, path: str, columns: dict, segment_rows: int = SEGMENT_ROWS, readonly: bool = False):
+        self.path = path
+        self.columns = {name: np.dtype(dtype) for name, dtype in columns.items()}
+        self.segment_rows = segment_rows
+        self.readonly = readonly
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        self.segments = sorted(int(name) for name in os.listdir(path) if name.isdigit()) if os.path.isdir(path) else []
+        self.files = {}
+        self.rows = 0
+        if not self.segments:
+            self.segments.append(0)
+        if readonly:
+            self.rows = self.segment_rows_on_disk(self.segments[-1])
+        else:
+            self.open_segment(self.segments[-1])
+
+    def segment_path(self, segment: int, column: str = ''):
+        return os.path.join(self.path, f'{segment:08d}', f'{column}.bin' if column else '')
+
+    def segment_rows_on_disk(self, segment: int):
+        rows = []
+        for name, dtype in self.columns.items():
+            try:
+                rows.append(os.path.getsize(self.segment_path(segment, name)) // dtype.itemsize)
+            except OSError:
+                rows.append(0)
+        return min(rows)
+
+    def open_segment(self, segment: int):
+        os.makedirs(self.segment_path(segment), exist_ok=True)
+        self.rows = self.segment_rows_on_disk(segment)
+        for name, dtype in self.columns.items():
+            path = self.segment_path(segment, name)
+            with open(path, 'ab') as file:
+                file.truncate(self.rows * dtype.itemsize)
+            self.files[name] = open(path, 'ab')
+
+    def append(self, **values):
+        arrays = {name: np.asarray(values[name], dtype=dtype).reshape(-1) for name, dtype in self.columns.items()}
+        count = len(next(iter(arrays.values())))
+        if count == 0:
+            return
+        if self.rows and self.rows + count > self.segment_rows:
+            self.roll()
+        for name, array in arrays.items():
+            self.files[name].write(array.tobytes())
+        for file in self.files.values():
+            file.flush()
+        self.rows += count
+
+    def roll(self):
+        for file in self.files.values():
+            file.close()
+        self.segments.append(self.segments[-1] + 1)
+        self.open_segment(self.segments[-1])
+
+    def read_segment(self, segment: int):
+        # Read-only memory maps of all columns of one segment
+        rows = self.rows if segment == self.segments[-1] and not self.readonly else self.segment_rows_on_disk(segment)
+        if rows == 0:
+            return {name: np.empty(0, dtype) for name, dtype in self.columns.items()}
+        return {name: np.memmap(self.segment_path(segment, name), dtype=dtype, mode='r', shape=(rows,))
+                for name, dtype in self.columns.items()}
+
+    def __iter__(self):
+        # Segments oldest first
+        for segment in list(self.segments):
+            yield self.read_segment(segment)
+
+    def tail(self, rows: int):
+        # Copies of the last 'rows' rows
+        parts = []
+        for segment in reversed(self.segments):
+            columns = self.read_segment(segment)
+            length = len(next(iter(columns.values())))
+            parts.append({name: np.array(column[max(0, length - rows):]) for name, column in columns.items()})
+            rows -= length
+            if rows <= 0:
+                break
+        parts.reverse()
+        return {name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype)
+                for name, dtype in self.columns.items()}
+
+    def drop_before(self, time_column: str, oldest: float):
+        # Removes whole segments (never the current one) whose newest row is older than 'oldest'
+        while len(self.segments) > 1:
+            times = self.read_segment(self.segments[0])[time_column]
+            if len(times) and times[-1] >= oldest:
+                break
+            del times
+            shutil.rmtree(self.segment_path(self.segments[0]), ignore_errors=True)
+            self.segments.pop(0)
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        self.files = {}
+
+
+class PrbStore:
+    # Persistent PRB time series: per-cell samples (time, cell, prb) and the
+    # fleet load appended to the predictor history (time, load; NaN while the
+    # cell windows fill up). Cell ids are mapped to column values through an
+    # append-only cells.json.
+    def __init__(self, path: str, segment_rows: int = SEGMENT_ROWS, retention_sec: float = 0, readonly: bool = False):
+        self.path = path
+        self.retention_sec = retention_sec
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        self.cells = ColumnTable(os.path.join(path, 'cells'), {'time': '<f8', 'cell': '<u4', 'prb': '<f4'},
+                                 segment_rows, readonly)
+        self.fleet = ColumnTable(os.path.join(path, 'fleet'), {'time': '<f8', 'load': '<f4'}, segment_rows, readonly)
+        self.cell_ids = []
+        try:
+            with open(os.path.join(path, 'cells.json')) as file:
+                self.cell_ids = json.load(file)
+        except FileNotFoundError:
+            pass
+        self.cell_index = {cell_id: index for index, cell_id in enumerate(self.cell_ids)}
+
+    def index_of(self, cell_id: str):
+        index = self.cell_index.get(cell_id)
+        if index is None:
+            index = self.cell_index[cell_id] = len(self.cell_ids)
+            self.cell_ids.append(cell_id)
+            tmp_path = os.path.join(self.path, 'cells.json.tmp')
+            with open(tmp_path, 'w') as file:
+                json.dump(self.cell_ids, file)
+            os.replace(tmp_path, os.path.join(self.path, 'cells.json'))
+        return index
+
+    def append_cells(self, now: float, cell_ids, values):
+        segments = len(self.cells.segments)
+        self.cells.append(time=np.full(len(cell_ids), now), cell=[self.index_of(cell_id) for cell_id in cell_ids],
+                          prb=values)
+        if self.retention_sec > 0 and len(self.cells.segments) != segments:
+            self.cells.drop_before('time', now - self.retention_sec)
+
+    def append_fleet(self, now: float, load: float):
+        segments = len(self.fleet.segments)
+        self.fleet.append(time=[now], load=[load])
+        if self.retention_sec > 0 and len(self.fleet.segments) != segments:
+            self.fleet.drop_before('time', now - self.retention_sec)
+
+    def recent_cells(self, since: float, per_cell: int):
+        # The last per_cell samples of every cell since 'since', oldest first
+        tail = self.cells.tail(max(len(self.cell_ids), 1) * per_cell * 4)
+        recent = tail['time'] >= since
+        cells, prb = tail['cell'][recent], tail['prb'][recent]
+        order = np.argsort(cells, kind='stable')
+        groups = np.split(order, np.flatnonzero(np.diff(cells[order])) + 1) if len(order) else []
+        return [(self.cell_ids[cells[group[0]]], prb[group[-per_cell:]]) for group in groups]
+
+    def recent_fleet(self, since: float, count: int):
+        tail = self.fleet.tail(count)
+        return tail['load'][tail['time'] >= since]
+
+    def fleet_load(self):
+        # Fleet load series of every segment, memory mapped, oldest first
+        for columns in self.fleet:
+            yield columns['load']
+
+    def close(self):
+        self.cells.close()
+        self.fleet.close()
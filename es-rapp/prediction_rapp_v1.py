@@ -2,63 +2,306 @@
 #SPDX-License-Identifier: Apache-2.0
 #Copyright 2024 Intel Corporation
 
-from flask import Flask,request
-import pandas as pd
-import tensorflow as tf
+from flask import Flask,request,jsonify,Response
 import numpy as np
 import json
-from tensorflow import keras
-from keras.models import Sequential
-from keras.layers import Dense
-from keras.callbacks import ModelCheckpoint, EarlyStopping
+import logging
+import os
+import threading
+from collections import namedtuple
+
+import model_artifacts
+import predictor_protocol
+from forecast_cache import ForecastCache, MODEL_VERSION_HEADER
+from micro_batcher import MicroBatcher
+from model_updates import ModelWatcher, Retrainer, train_first_model
+
+log = logging.getLogger('predictor')
+
 app = Flask(__name__)
 
-model = None
+# Directory with model artifacts created by train_model.py, and the version to
+# serve (defaults to the latest one)
+MODEL_DIR = os.environ.get('MODEL_DIR', 'models')
+MODEL_VERSION = os.environ.get('MODEL_VERSION')
+TRAINING_DATA = os.environ.get('TRAINING_DATA', 'load_test.csv')
+# 'numpy' runs the forward pass without TensorFlow, 'keras' uses the saved Keras model
+INFERENCE_ENGINE = os.environ.get('INFERENCE_ENGINE', 'numpy')
+# Concurrent /predict requests are coalesced into batches of up to this size,
+# collected for at most MICRO_BATCH_MAX_WAIT_MS. A size of 1 disables it.
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', '32'))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', '1'))
+# 'prefork' serves from PREDICTOR_WORKERS processes sharing the model loaded
+# before fork, 'dev' runs the single-process Flask development server
+PREDICTOR_SERVER = os.environ.get('PREDICTOR_SERVER', 'prefork')
+PREDICTOR_PORT = int(os.environ.get('PREDICTOR_PORT', '9008'))
+PREDICTOR_WORKERS = int(os.environ.get('PREDICTOR_WORKERS', '0')) or os.cpu_count() or 1
+# Connections waiting to be accepted, and requests in progress per worker
+# before further ones are answered with 503
+PREDICTOR_BACKLOG = int(os.environ.get('PREDICTOR_BACKLOG', '128'))
+PREDICTOR_MAX_INFLIGHT = int(os.environ.get('PREDICTOR_MAX_INFLIGHT', '64'))
+# /predict forecasts by rounded window and model version, per worker
+FORECAST_CACHE_SIZE = int(os.environ.get('FORECAST_CACHE_SIZE', '4096'))
+FORECAST_CACHE_TTL_SEC = float(os.environ.get('FORECAST_CACHE_TTL_SEC', '86400'))
+FORECAST_CACHE_QUANTUM = float(os.environ.get('FORECAST_CACHE_QUANTUM', '1'))
+# Every worker checks MODEL_DIR for a new latest version this often (0 disables
+# it; a pinned MODEL_VERSION is never replaced)
+MODEL_POLL_SEC = float(os.environ.get('MODEL_POLL_SEC', '30'))
+# With RETRAIN_DATA set (a PRB store or CSV file) the latest model is trained
+# further on its last RETRAIN_RECENT_SAMPLES samples every RETRAIN_INTERVAL_SEC
+RETRAIN_DATA = os.environ.get('RETRAIN_DATA', '')
+RETRAIN_INTERVAL_SEC = float(os.environ.get('RETRAIN_INTERVAL_SEC', '3600'))
+RETRAIN_RECENT_SAMPLES = int(os.environ.get('RETRAIN_RECENT_SAMPLES', '8640'))
+RETRAIN_EPOCHS = int(os.environ.get('RETRAIN_EPOCHS', '5'))
+RETRAIN_MAX_REGRESSION = float(os.environ.get('RETRAIN_MAX_REGRESSION', '0'))
+
+# The served model and its metadata, replaced as a whole so that a request
+# never sees the model of one version with the metadata of another
+Serving = namedtuple('Serving', ['model', 'metadata'])
+serving = None
+swap_lock = threading.Lock()
+batcher = None
+inflight = threading.BoundedSemaphore(PREDICTOR_MAX_INFLIGHT)
+forecast_cache = ForecastCache(FORECAST_CACHE_SIZE, FORECAST_CACHE_TTL_SEC, FORECAST_CACHE_QUANTUM)
+
+
+def model_predict(X, current=None):
+    # current: the Serving a request started with, so that its forecast, version
+    # header and cache key all belong to the same model even across a swap
+    return (current or serving).model.predict(X, verbose=0)
+
+
+def horizon(metadata):
+    # Forecast steps requested with ?horizon=K, limited to what the model was trained for
+    requested = request.args.get('horizon', default=1, type=int)
+    return max(1, min(requested, metadata.get('horizon', 1)))
+
+
+def window(req, metadata):
+    look_back = metadata.get('look_back', 8)
+    return req[len(req) - look_back:]
+
+
+@app.before_request
+def admit():
+    # Bounded queue: a busy worker sheds load instead of piling up threads
+    if request.endpoint in ('predict', 'predict_batch'):
+        if serving is None:
+            return jsonify(error='Model not loaded'), 503, {'Retry-After': '1'}
+        if not inflight.acquire(blocking=False):
+            return jsonify(error='Overloaded'), 503, {'Retry-After': '1'}
+        request.environ['predictor.inflight'] = True
+    # The version a request started with is the one reported, even if a swap happens meanwhile
+    request.environ['predictor.serving'] = serving
+
+
+@app.after_request
+def add_model_version(response):
+    current = request.environ.get('predictor.serving')
+    if current is not None:
+        response.headers[MODEL_VERSION_HEADER] = str(current.metadata.get('version'))
+    return response
+
+
+@app.teardown_request
+def release(exc):
+    if request.environ.pop('predictor.inflight', False):
+        inflight.release()
+
+
+@app.route("/ready", methods=['GET'])
+def ready():
+    # Readiness probe: 200 once the model is loaded in this worker, 503 before
+    current = serving
+    if current is None:
+        return jsonify(ready=False, pid=os.getpid()), 503
+    return jsonify(ready=True, version=current.metadata.get('version'), engine=INFERENCE_ENGINE,
+                   horizon=current.metadata.get('horizon', 1), pid=os.getpid())
+
+
+@app.route("/model", methods=['GET'])
+def model_info():
+    # Served version and its metadata, the latest artifact and the versions served before
+    current = serving
+    return jsonify(pid=os.getpid(), serving=current.metadata if current else None,
+                   latest=model_artifacts.latest_version(MODEL_DIR),
+                   history=model_artifacts.promotion_history(MODEL_DIR))
+
+
+@app.route("/model/rollback", methods=['POST'])
+def model_rollback():
+    # Serves the previous version again; the other workers follow within MODEL_POLL_SEC
+    if MODEL_VERSION:
+        return jsonify(error=f'MODEL_VERSION is pinned to {MODEL_VERSION}'), 409
+    try:
+        version = model_artifacts.rollback(MODEL_DIR)
+        swap_model(version)
+    except (ValueError, OSError) as ex:
+        return jsonify(error=str(ex)), 409
+    return jsonify(version=version, pid=os.getpid())
+
+
+@app.route("/cache", methods=['GET'])
+def cache_stats():
+    # Forecast cache size and hit rate of this worker
+    return jsonify(pid=os.getpid(), **forecast_cache.stats())
+
+
+def respond(values):
+    accept = predictor_protocol.negotiate(request.headers.get('Accept'))
+    return Response(predictor_protocol.dumps(values, accept), mimetype=accept)
 
 
 @app.route("/predict", methods=['POST'])
 def predict():
-    
-    l = []
-    req = json.loads(request.json)
-    print(req)
-    le = len(req)
-    l.append(req[le - 8:])
-    Z = model.predict(np.array(l))
-    print(str(Z[0][0]))
-    return ([str(int(Z[0][0]))])
-
-def convert2matrix(data_arr, look_back, full_data):
- X, Y =[], []
- 
- for i in range(len(data_arr)-look_back):
-  d=i+look_back
-  xdata = data_arr[i:d]
-  X.append(xdata)
-  Y.append(data_arr[d])
- return np.array(X), np.array(Y)
- 
-def model_dnn(look_back):
-    model = Sequential()
-    model.add(Dense(units=32, input_dim=look_back, activation='relu'))
-    model.add(Dense(look_back, activation='relu'))
-    model.add(Dense(1))
-
-    model.compile(loss= "mse",  optimizer='adam',metrics = ['mse', 'mae'])
-    return model
-
-
-df = pd.DataFrame(pd.read_csv("load_test.csv"))
-train_size = 300
-train, test = (df['Load'].tolist())[0:train_size], (df['Load'].tolist())[train_size:len(df.values)]
-look_back = 8
-print("--------------------------------------------")
-trainX, trainY = convert2matrix(train, look_back, df[0:train_size])
-testX, testY = convert2matrix(test, look_back, df[train_size:])
-model = model_dnn(look_back)
-print(trainX, trainY)
-print(model)
-model.fit(trainX,trainY, epochs=100, batch_size=10, verbose=1, validation_data=(testX,testY),callbacks=[EarlyStopping(monitor='val_loss', patience=10)],shuffle=False)
-
-
-app.run(host='0.0.0.0', port=9008)
+    # Numeric array in (see predictor_protocol), numeric array with the forecast for
+    # the next 'horizon' steps out
+    content_type = request.mimetype
+    if content_type not in predictor_protocol.supported_types():
+        return jsonify(error=f'Unsupported content type {content_type}'), 415
+    req = predictor_protocol.loads(request.get_data(), content_type)
+    # Older clients send the window as a JSON encoded string and expect ["<int>"] back
+    legacy = isinstance(req, str)
+    if legacy:
+        req = json.loads(req)
+    log.debug('Predict request %s', req)
+    current = request.environ['predictor.serving']
+    metadata = current.metadata
+    key = forecast_cache.key(window(req, metadata), version=metadata['version'])
+    Z = forecast_cache.get(key)
+    if Z is None:
+        if batcher is not None:
+            Z = batcher.predict(window(req, metadata), current)
+        else:
+            Z = model_predict(np.array([window(req, metadata)], dtype=np.float32), current)[0]
+        forecast_cache.put(key, Z)
+    log.debug('Predicted %s', Z[0])
+    if legacy:
+        return ([str(int(Z[0]))])
+    return respond(Z[:horizon(metadata)])
+
+
+@app.route("/predict_batch", methods=['POST'])
+def predict_batch():
+    # Array of history windows in (JSON or msgpack), array of predictions (same order) out.
+    # With ?horizon=K every prediction is itself an array of K forecast steps.
+    content_type = request.mimetype
+    if content_type == predictor_protocol.FLOAT32 or content_type not in predictor_protocol.supported_types():
+        return jsonify(error=f'Unsupported content type {content_type}'), 415
+    windows = predictor_protocol.loads(request.get_data(), content_type)
+    if not isinstance(windows, list) or not all(isinstance(w, list) for w in windows):
+        return jsonify(error='Expected an array of history windows'), 400
+    if not windows:
+        return respond([])
+    current = request.environ['predictor.serving']
+    Z = current.model.predict(np.array([window(w, current.metadata) for w in windows], dtype=np.float32), verbose=0)
+    if 'horizon' in request.args:
+        return respond(Z[:, :horizon(current.metadata)])
+    return respond(Z[:, 0])
+
+
+def ensure_model():
+    # Version to serve; without any artifact yet the model is trained once and
+    # kept, so later starts only load it. Training runs in a child process so
+    # that TensorFlow is never imported by the process that forks the workers.
+    if MODEL_VERSION or model_artifacts.latest_version(MODEL_DIR):
+        return MODEL_VERSION
+    log.info('No model artifact in %s, training from %s', MODEL_DIR, TRAINING_DATA)
+    version = train_first_model(TRAINING_DATA, MODEL_DIR)
+    log.info('Saved model version %s to %s', version, MODEL_DIR)
+    return version
+
+
+def load_model():
+    swap_model(ensure_model())
+
+
+def validate(candidate, metadata):
+    # A candidate must take the same input as the served model and give finite
+    # forecasts for every step of its horizon
+    if serving is not None and metadata.get('look_back', 8) != serving.metadata.get('look_back', 8):
+        raise ValueError(f'look_back {metadata.get("look_back")} differs from the served model')
+    probe = np.linspace(0, 100, metadata.get('look_back', 8), dtype=np.float32)[np.newaxis]
+    forecast = candidate.predict(probe, verbose=0)
+    if forecast.shape != (1, metadata.get('horizon', 1)) or not np.all(np.isfinite(forecast)):
+        raise ValueError(f'Invalid forecast {forecast} for a probe window')
+
+
+def swap_model(version=None):
+    # Loads and validates a version next to the served one, then replaces it
+    # in one assignment; requests in progress finish with the model they started with
+    global serving
+    with swap_lock:
+        candidate, metadata = model_artifacts.load(MODEL_DIR, version, INFERENCE_ENGINE)
+        if serving is not None and metadata['version'] == serving.metadata['version']:
+            return
+        validate(candidate, metadata)
+        previous = serving.metadata['version'] if serving is not None else None
+        serving = Serving(candidate, metadata)
+        forecast_cache.set_version(metadata['version'])
+    log.info('Serving model version %s from %s', metadata['version'], MODEL_DIR,
+             extra={'version': metadata['version'], 'previous_version': previous, 'engine': INFERENCE_ENGINE})
+
+
+def start_updates():
+    # Follows the latest artifact in this process, unless a version is pinned.
+    # Every worker loads a new version on its own, so after a swap the weights
+    # are no longer shared copy-on-write with the other workers.
+    if MODEL_POLL_SEC > 0 and not MODEL_VERSION:
+        # A worker restarted after a swap catches up before it serves
+        ModelWatcher(MODEL_DIR, lambda: serving.metadata['version'] if serving else None, swap_model,
+                     MODEL_POLL_SEC).check()
+
+
+def retrainer(start=True):
+    return Retrainer(RETRAIN_DATA, MODEL_DIR, RETRAIN_INTERVAL_SEC,
+                     args=['--recent', str(RETRAIN_RECENT_SAMPLES), '--epochs', str(RETRAIN_EPOCHS),
+                           '--max-regression', str(RETRAIN_MAX_REGRESSION)], start=start)
+
+
+def start_retrainer():
+    # Development server: a thread next to the request threads
+    if RETRAIN_DATA:
+        retrainer()
+
+
+def run_retrainer():
+    # Prefork server: the loop of a process of its own, as a thread of the
+    # parent could hold a lock at the moment a worker is forked
+    retrainer(start=False).run()
+
+
+def start_batcher():
+    global batcher
+    if MICRO_BATCH_MAX_SIZE > 1:
+        batcher = MicroBatcher(model_predict, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS)
+
+
+def start_worker():
+    # Runs in every worker after fork; threads do not survive fork
+    if serving is None:
+        load_model()
+    start_batcher()
+    start_updates()
+
+
+if __name__ == '__main__':
+    import predictor_logging
+    predictor_logging.configure()
+    if PREDICTOR_SERVER == 'dev':
+        load_model()
+        start_batcher()
+        start_updates()
+        start_retrainer()
+        app.run(host='0.0.0.0', port=PREDICTOR_PORT)
+    else:
+        from prefork_server import PreforkServer
+        # TensorFlow is not fork-safe: with the keras engine each worker loads
+        # its own copy, the numpy weights are loaded once and shared
+        if INFERENCE_ENGINE == 'keras':
+            ensure_model()
+        else:
+            load_model()
+        # Retraining is scheduled once, in a process next to the workers
+        PreforkServer(app, '0.0.0.0', PREDICTOR_PORT, PREDICTOR_WORKERS, PREDICTOR_BACKLOG,
+                      post_fork=start_worker, background=run_retrainer if RETRAIN_DATA else None).serve()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Logging setup of the predictor service. LOG_FORMAT 'json' writes one JSON
+# object per record (time, level, logger, pid, message and any extra fields),
+# 'text' a plain line. LOG_LEVEL sets the level, per-request records are DEBUG.
+
+import json
+import logging
+import os
+import time
+
+# Attributes every LogRecord has; anything else was passed with extra=
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+    converter = time.gmtime
+
+    def format(self, record):
+        entry = {
+            'time': f'{self.formatTime(record, "%Y-%m-%dT%H:%M:%S")}.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'message': record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in STANDARD_ATTRIBUTES and not name.startswith('_'):
+                entry[name] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure(level=None, fmt=None):
+    level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.environ.get('LOG_FORMAT', 'json')
+    handler = logging.StreamHandler()
+    if fmt == 'json':
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(process)d - %(levelname)s - %(message)s'))
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(level)
+    # Request lines of the development server are only wanted when debugging
+    logging.getLogger('werkzeug').setLevel(logging.DEBUG if level == 'DEBUG' else logging.WARNING)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Wire format between es-rapp and the load predictor. A query is a flat numeric
+# array (history window followed by the time-of-day slot and a trailing 0) and
+# the answer is a numeric array with one value per forecast step. Both can be
+# sent as a JSON array, as packed little-endian float32 or, when the msgpack
+# package is installed, as a msgpack array. The request body is described by
+# Content-Type and the answer format is chosen from the Accept header.
+
+import json
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'application/json'
+FLOAT32 = 'application/x-float32'
+MSGPACK = 'application/msgpack'
+
+FORMATS = {'json': JSON, 'float32': FLOAT32, 'msgpack': MSGPACK}
+
+
+def supported_types():
+    types = [JSON, FLOAT32]
+    if msgpack is not None:
+        types.append(MSGPACK)
+    return types
+
+
+def dumps(values, content_type=JSON) -> bytes:
+    if content_type == FLOAT32:
+        return np.asarray(values, dtype='<f4').tobytes()
+    if isinstance(values, np.ndarray):
+        values = values.tolist()
+    if content_type == MSGPACK and msgpack is not None:
+        return msgpack.packb(values)
+    if content_type == JSON:
+        return json.dumps(values).encode()
+    raise ValueError(f'Unsupported content type {content_type}')
+
+
+def loads(body: bytes, content_type=JSON):
+    # JSON and msgpack give back the decoded object, float32 a 1-D array
+    if content_type == FLOAT32:
+        return np.frombuffer(body, dtype='<f4')
+    if content_type == MSGPACK and msgpack is not None:
+        return msgpack.unpackb(body)
+    if content_type == JSON:
+        return json.loads(body)
+    raise ValueError(f'Unsupported content type {content_type}')
+
+
+def negotiate(accept):
+    # First supported type listed in the Accept header, JSON otherwise
+    for item in (accept or '').split(','):
+        content_type = item.split(';')[0].strip()
+        if content_type in supported_types():
+            return content_type
+    return JSON
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+import logging
+import os
+import signal
+import socket
+import time
+
+from werkzeug.serving import make_server
+
+log = logging.getLogger('predictor')
+
+# A worker exiting sooner than this after its start is restarted with a delay
+MIN_WORKER_LIFETIME_SEC = 1.0
+
+
+class PreforkServer:
+    # Serves a WSGI app from 'workers' processes forked from the current one.
+    # Everything loaded before serve() (e.g. model weights) is shared with the
+    # workers copy-on-write. All workers accept on one listening socket whose
+    # queue holds at most 'backlog' connections; post_fork runs in each worker
+    # before it starts serving (threads do not survive fork). background, if
+    # given, runs in one more process that does not serve, so the server itself
+    # never forks while another of its threads holds a lock. Processes that die
+    # are replaced, SIGTERM/SIGINT stop all of them.
+    def __init__(self, app, host: str, port: int, workers: int, backlog: int = 128, post_fork=None,
+                 background=None):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.backlog = backlog
+        self.post_fork = post_fork
+        self.background = background
+        # pid -> (start time, target of the process, None for a worker)
+        self.children = {}
+        self.stopping = False
+        self.socket = None
+
+    def serve(self):
+        self.socket = socket.create_server((self.host, self.port), backlog=self.backlog)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        log.info('Starting %d workers on %s:%d', self.workers, self.host, self.port)
+        for _ in range(self.workers):
+            self.spawn()
+        if self.background is not None:
+            self.spawn(self.background)
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            child = self.children.pop(pid, None)
+            if child is None or self.stopping:
+                continue
+            started, target = child
+            log.warning('%s %d exited with status %d, restarting', 'Worker' if target is None else 'Background process',
+                        pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_WORKER_LIFETIME_SEC:
+                time.sleep(MIN_WORKER_LIFETIME_SEC)
+            self.spawn(target)
+        self.socket.close()
+        log.info('Stopped')
+
+    def spawn(self, target=None):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (time.monotonic(), target)
+            return
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            if target is not None:
+                self.socket.close()
+                target()
+            else:
+                self.work()
+        except Exception:
+            log.exception('Process %d failed', os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def work(self):
+        if self.post_fork is not None:
+            self.post_fork()
+        server = make_server(self.host, self.port, self.app, threaded=True, fd=self.socket.fileno())
+        log.info('Worker %d serving', os.getpid())
+        server.serve_forever()
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
@@ -0,0 +1,350 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+# Offline replay of recorded PM reports through the rApp pipeline on a virtual
+# clock, with in-process stand-ins for A1, SDN-C and the load predictor, e.g.
+#   python replay.py recorded_reports.tar.gz --output timeline.csv
+
+import argparse
+import csv
+import json
+import logging
+import os
+import tarfile
+import tempfile
+import time
+import zipfile
+
+import numpy as np
+import requests
+
+import predictor_protocol
+from http_clients import RequestRunner
+from metrics import MetricsServer
+
+log = logging.getLogger('main')
+
+
+class VirtualClock:
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class LocalResponse:
+    # The parts of requests.Response the rApp uses
+    def __init__(self, status_code: int, content: bytes = b'', content_type: str = predictor_protocol.JSON):
+        self.status_code = status_code
+        self.content = content
+        self.headers = {'Content-Type': content_type}
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f'{self.status_code} Error', response=self)
+
+
+def json_response(status_code, body=None):
+    return LocalResponse(status_code, b'' if body is None else json.dumps(body).encode())
+
+
+class LocalEndpoint:
+    # In-process stand-in for an EndpointClient, requests go to handle()
+    def request(self, method: str, path: str = '', **kwargs):
+        return self.handle(method, path, **kwargs)
+
+    def get(self, path: str = '', **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def put(self, path: str = '', **kwargs):
+        return self.request('PUT', path, **kwargs)
+
+    def post(self, path: str = '', **kwargs):
+        return self.request('POST', path, **kwargs)
+
+    def delete(self, path: str = '', **kwargs):
+        return self.request('DELETE', path, **kwargs)
+
+    def close(self):
+        pass
+
+
+class LocalA1(LocalEndpoint):
+    # Policy store of the A1 policy type the rApp uses
+    def __init__(self):
+        self.policies = {}
+        self.requests = 0
+
+    def handle(self, method, path, json=None, **kwargs):
+        self.requests += 1
+        if method == 'GET':
+            return json_response(200, list(self.policies))
+        policy_id = path.rsplit('/', 1)[-1]
+        if method == 'PUT':
+            created = policy_id not in self.policies
+            self.policies[policy_id] = json
+            return json_response(201 if created else 200)
+        if method == 'DELETE':
+            return json_response(204 if self.policies.pop(policy_id, None) is not None else 404)
+        return json_response(405)
+
+
+class LocalSdnc(LocalEndpoint):
+    # Administrative state per cell object instance
+    def __init__(self):
+        self.states = {}
+        self.requests = 0
+
+    def handle(self, method, path, json=None, **kwargs):
+        self.requests += 1
+        if method == 'PUT':
+            self.states[path] = json['attributes']['administrativeState']
+            return json_response(200)
+        return json_response(405)
+
+
+class LocalTopology:
+    # Every cell is known, with a made up object instance
+    def start(self):
+        return True
+
+    def get(self, cell_id):
+        return f'ManagedElement=replay,GnbDuFunction=1,NrCellDu={cell_id}'
+
+
+class LocalPredictor(LocalEndpoint):
+    # Answers /predict queries with a saved model artifact (numpy engine), or
+    # with the last observed load for every step when no model is given
+    def __init__(self, model_dir: str = '', model_version: str = None):
+        self.model = None
+        self.look_back = None
+        self.max_horizon = None
+        self.requests = 0
+        if model_dir:
+            import model_artifacts
+            self.model, metadata = model_artifacts.load(model_dir, model_version, engine='numpy')
+            self.look_back = metadata['look_back']
+            self.max_horizon = metadata.get('horizon', 1)
+
+    def handle(self, method, path, headers=None, params=None, data=None, **kwargs):
+        if method == 'GET':
+            # Readiness and version check, not a query
+            return json_response(200, {'ready': True})
+        self.requests += 1
+        content_type = headers.get('Content-Type', predictor_protocol.JSON)
+        values = predictor_protocol.loads(data, content_type)
+        horizon = int((params or {}).get('horizon', 1))
+        if self.model is None:
+            # The query ends with the time slot and a padding value
+            forecast = [values[-3]] * horizon
+        else:
+            window = np.asarray(values[-self.look_back:], dtype=np.float32).reshape(1, -1)
+            forecast = self.model.predict(window, verbose=0)[0][:min(horizon, self.max_horizon)].tolist()
+        accept = headers.get('Accept', content_type)
+        return LocalResponse(200, predictor_protocol.dumps(forecast, accept), accept)
+
+
+class ReplaySource:
+    # Stands in for the ReportWatcher: the recorded reports become due one per
+    # report_interval_sec of virtual time, in file name order
+    def __init__(self, paths, clock: VirtualClock, report_interval_sec: float):
+        self.paths = paths
+        self.clock = clock
+        self.report_interval_sec = report_interval_sec
+        self.start = clock()
+        self.position = 0
+        self.retries = []
+
+    def exhausted(self):
+        return self.position >= len(self.paths) and not self.retries
+
+    def wait(self, timeout_sec):
+        self.clock.advance(timeout_sec)
+        return True
+
+    def retry(self, path, due_sec):
+        self.retries.append((path, due_sec))
+
+    def drain(self):
+        # (path, virtual time the report became due) pairs
+        due = int((self.clock() - self.start) / self.report_interval_sec) + 1
+        batch = [(path, self.start + (self.position + offset) * self.report_interval_sec)
+                 for offset, path in enumerate(self.paths[self.position:due])]
+        self.position += len(batch)
+        batch, self.retries = self.retries + batch, []
+        return batch
+
+    def close(self):
+        pass
+
+
+def report_paths(source, workdir):
+    # Recorded reports from a directory or a tar/zip archive, extracted to workdir
+    if os.path.isdir(source):
+        root = source
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            archive.extractall(workdir)
+        root = workdir
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            if hasattr(tarfile, 'data_filter'):
+                archive.extractall(workdir, filter='data')
+            else:
+                archive.extractall(workdir)
+        root = workdir
+    else:
+        raise ValueError(f'{source} is neither a directory nor a tar or zip archive')
+    paths = []
+    for directory, _, names in os.walk(root):
+        paths.extend(os.path.join(directory, name) for name in names if not name.startswith('.'))
+    return sorted(paths, key=lambda path: (os.path.basename(path), path))
+
+
+def replay_application(data_path, sleep_time_sec, sleep_after_decision_sec, avg_slots, model_dir='', model_version=None,
+                       prb_store_path=''):
+    # The rApp configuration is read from the environment as usual, the
+    # endpoints it would talk to are only placeholders here
+    for name in ('LOAD_PREDICTOR', 'LOAD_PREDICTOR_PORT', 'LOAD_PREDICTOR_API', 'A1T_ADDRESS', 'A1T_PORT',
+                 'SDN_CONTROLLER_ADDRESS', 'SDN_CONTROLLER_PORT', 'SDN_CONTROLLER_USERNAME', 'SDN_CONTROLLER_PASSWORD'):
+        os.environ.setdefault(name, 'replay')
+    os.environ['RANSIM_DATA_PATH'] = data_path
+    os.environ['PRB_STORE_PATH'] = prb_store_path
+    # The stand-in A1 starts empty, ids recorded by a real rApp are not ours to delete
+    os.environ['POLICY_REGISTRY_PATH'] = ''
+    from main import Application
+
+    class ReplayApplication(Application):
+        def remove_report(self, report):
+            # Recorded reports are kept
+            pass
+
+        shed_report = remove_report
+
+    app = ReplayApplication(sleep_time_sec, sleep_after_decision_sec, avg_slots)
+    for client in (app.a1, app.sdnc, app.predictor):
+        client.close()
+    app.clock = VirtualClock()
+    app.ready_time = app.clock() + sleep_after_decision_sec
+    app.a1 = LocalA1()
+    app.sdnc = LocalSdnc()
+    app.predictor = LocalPredictor(model_dir, model_version)
+    app.topology = LocalTopology()
+    # Requests are sent one by one so that the run is deterministic
+    app.runner.close()
+    app.runner = RequestRunner(use_async=False)
+    return app
+
+
+TIMELINE_FIELDS = ['time_sec', 'decision', 'reports', 'observed_load', 'predicted_load', 'predictor_queries',
+                   'cells', 'cells_off', 'switched_off', 'switched_on', 'power_w', 'power_all_on_w', 'energy_wh',
+                   'energy_saved_wh']
+
+
+def replay(app, source: ReplaySource, timeline_writer=None):
+    # Runs the pipeline until every report was processed, returns a summary
+    app.sync_policies()
+    app.watcher = source
+    locked = set()
+    decisions = 0
+    fleet = app.fleet
+    started = time.perf_counter()
+
+    while not source.exhausted():
+        source.wait(app.sleep_time_sec)
+        index = app.index
+        app.process_reports()
+
+        if app.index == index:
+            continue
+        decisions += 1
+        fleet.advance()
+        now_locked = {app.cells.ids[i] for i in np.flatnonzero(app.decision_engine.locked)}
+        if timeline_writer is not None:
+            timeline_writer.writerow({
+                'time_sec': app.clock(),
+                'decision': app.index,
+                'reports': source.position,
+                'observed_load': int(app.prb_history.window()[-1]),
+                'predicted_load': app.last_prediction,
+                'predictor_queries': app.predictor.requests,
+                'cells': len(app.cells),
+                'cells_off': len(now_locked),
+                'switched_off': ' '.join(sorted(now_locked - locked)),
+                'switched_on': ' '.join(sorted(locked - now_locked)),
+                'power_w': fleet.power_w,
+                'power_all_on_w': fleet.power_all_on_w,
+                'energy_wh': round(fleet.energy_wh, 6),
+                'energy_saved_wh': round(fleet.energy_saved_wh, 6),
+            })
+        locked = now_locked
+
+    elapsed = time.perf_counter() - started
+    fleet.advance()
+    virtual = app.clock()
+    return {
+        'reports': source.position,
+        'decisions': decisions,
+        'cells': len(app.cells),
+        'predictor_queries': app.predictor.requests,
+        'a1_requests': app.a1.requests,
+        'sdnc_requests': app.sdnc.requests,
+        'virtual_sec': virtual,
+        'wall_sec': elapsed,
+        'reports_per_sec': source.position / elapsed if elapsed > 0 else None,
+        'speedup': virtual / elapsed if elapsed > 0 else None,
+        'energy_wh': fleet.energy_wh,
+        'energy_saved_wh': fleet.energy_saved_wh,
+        'metrics': app.metrics.registry.snapshot(),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay recorded PM reports through the rApp on a virtual clock')
+    parser.add_argument('source', help='Directory or tar/zip archive with PM report files, replayed in file name order')
+    parser.add_argument('--output', default='timeline.csv', help='CSV file for the decision and energy timeline')
+    parser.add_argument('--report-interval-sec', type=float, default=10.0, help='Virtual time between two recorded reports')
+    parser.add_argument('--sleep-time-sec', type=float, default=10.0)
+    parser.add_argument('--sleep-after-decision-sec', type=float, default=120.0)
+    parser.add_argument('--avg-slots', type=int, default=5)
+    parser.add_argument('--model-dir', default='', help='Answer predictor queries with this model artifact instead of the last observed load')
+    parser.add_argument('--model-version', default=None)
+    parser.add_argument('--prb-store', default='', help='Write the replayed PRB samples to this store, e.g. as training data')
+    parser.add_argument('--metrics-port', type=int, default=0, help='Serve the pipeline metrics on this port during the replay')
+    parser.add_argument('--log-level', default='WARNING')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='es-rapp-replay-') as workdir:
+        paths = report_paths(args.source, workdir)
+        app = replay_application(workdir, args.sleep_time_sec, args.sleep_after_decision_sec, args.avg_slots,
+                                 args.model_dir, args.model_version, args.prb_store)
+        log.setLevel(args.log_level.upper())
+        if args.metrics_port > 0:
+            MetricsServer(app.metrics.registry, args.metrics_port)
+        source = ReplaySource(paths, app.clock, args.report_interval_sec)
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=TIMELINE_FIELDS)
+            writer.writeheader()
+            summary = replay(app, source, writer)
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,69 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import math
+
+from pm_extract import PmSamples
+
+
+class BacklogPolicy:
+    # Load shedding for a backlog of PM reports, so that catching up after a
+    # stall takes bounded time and decisions act on fresh data. Reports queued
+    # for longer than max_age_sec are shed before they are parsed (0 keeps
+    # them all). Of the reports queued for longer than lag_sec, those of one
+    # sourceName and collection interval of interval_sec are merged into one
+    # with the mean of every counter per cell (0 disables merging). Fresh
+    # reports are one sample each, even when a cycle runs late, and rejected
+    # reports are passed on as they are.
+    def __init__(self, max_age_sec: float = 0.0, interval_sec: float = 0.0, lag_sec: float = 0.0):
+        self.max_age_sec = max_age_sec
+        self.interval_sec = interval_sec
+        self.lag_sec = lag_sec
+
+    def stale(self, received_sec: float, now: float):
+        return self.max_age_sec > 0 and now - received_sec > self.max_age_sec
+
+    def coalesce(self, reports, now: float):
+        # (PmSamples, received time) pairs oldest first in, PmSamples out in
+        # the order of their oldest part, and the number of reports merged away
+        if self.interval_sec <= 0 or len(reports) < 2:
+            return [samples for samples, _ in reports], 0
+        groups = {}
+        for position, (samples, received_sec) in enumerate(reports):
+            if samples.rejected is not None or now - received_sec <= self.lag_sec:
+                key = position
+            else:
+                # End of the collection interval, or when the report was written
+                interval = math.floor((samples.epoch_sec or received_sec) / self.interval_sec)
+                key = (samples.source_name, samples.meas_entity_dn, interval)
+            groups.setdefault(key, []).append(samples)
+        merged = [group[0] if len(group) == 1 else self.merge(group) for group in groups.values()]
+        return merged, len(reports) - len(merged)
+
+    def merge(self, group):
+        sums = {}
+        for samples in group:
+            for cell_id, values in zip(samples.cell_ids, samples.values):
+                total = sums.get(cell_id)
+                if total is None:
+                    sums[cell_id] = [list(values), 1]
+                else:
+                    total[0] = [a + b for a, b in zip(total[0], values)]
+                    total[1] += 1
+        newest = group[-1]
+        return PmSamples(newest.source_name, newest.meas_entity_dn, newest.epoch_sec, list(sums),
+                         [[value / count for value in total] for total, count in sums.values()])
@@ -0,0 +1,104 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import logging
+import os
+import time
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:
+    INotify = None
+
+log = logging.getLogger('main')
+
+
+class ReportWatcher:
+    # Tracks report files landing in the data directory. New files are picked up
+    # via inotify when available, otherwise by rescanning the directory. Hidden
+    # files are taken as uploads in progress and ignored.
+    def __init__(self, path: str, poll_interval_sec: float, use_inotify: bool = True):
+        self.path = path
+        self.poll_interval_sec = poll_interval_sec
+        self.pending = {}
+        # Reports to read again with the next batch; inotify reports a file only once
+        self.retries = {}
+        self.inotify = None
+
+        if use_inotify and INotify is not None:
+            try:
+                self.inotify = INotify()
+                # CLOSE_WRITE/MOVED_TO only fire once the writer is done with the file
+                self.inotify.add_watch(path, flags.CLOSE_WRITE | flags.MOVED_TO)
+            except OSError as ex:
+                log.warning(f'Unable to watch {path} ({ex}), falling back to polling')
+                self.inotify = None
+        elif use_inotify:
+            log.warning('inotify_simple not installed, falling back to polling')
+
+        log.info(f'Watching {path} for reports ({"inotify" if self.inotify else "polling"})')
+        self.scan()
+
+    def scan(self):
+        try:
+            with os.scandir(self.path) as entries:
+                for entry in entries:
+                    if entry.name not in self.pending and not entry.name.startswith('.') and entry.is_file():
+                        self.pending[entry.name] = entry.stat().st_mtime
+        except OSError as ex:
+            log.error(ex)
+
+    def wait(self, timeout_sec: float) -> bool:
+        # Returns as soon as at least one new report is pending, or after timeout_sec;
+        # True if there is anything to drain, including reports to retry
+        if self.pending:
+            return True
+
+        if self.inotify is None:
+            time.sleep(min(timeout_sec, self.poll_interval_sec))
+            self.scan()
+            return bool(self.pending or self.retries)
+
+        for event in self.inotify.read(timeout=int(timeout_sec * 1000)):
+            if event.mask & flags.Q_OVERFLOW:
+                log.warning('inotify event queue overflowed, rescanning')
+                self.scan()
+            elif event.name and event.name not in self.pending and not event.name.startswith('.'):
+                try:
+                    self.pending[event.name] = os.stat(os.path.join(self.path, event.name)).st_mtime
+                except OSError:
+                    # Already consumed or removed by someone else
+                    pass
+        return bool(self.pending or self.retries)
+
+    def retry(self, path: str, mtime: float):
+        # Hands a report that could not be read yet out again with the next drain
+        self.retries[os.path.basename(path)] = mtime
+
+    def drain(self):
+        # All pending reports as (path, modification time) pairs, oldest first
+        pending = dict(self.retries)
+        pending.update(self.pending)
+        ordered = sorted(pending.items(), key=lambda item: (item[1], item[0]))
+        self.pending = {}
+        self.retries = {}
+        return [(os.path.join(self.path, name), mtime) for name, mtime in ordered]
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,61 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def cell_report(values, source='du1', dn='ManagedElement=1,Cell', types=('RRU.PrbTotUl', 'RRU.PrbTotDl'),
+                last_epoch_sec=None):
+    # PM report with one measInfo per cell; values maps cell ids to the value of every counter in types
+    header = {'sourceName': source, 'startEpochMicrosec': 0}
+    if last_epoch_sec is not None:
+        header['lastEpochMicrosec'] = int(last_epoch_sec * 1e6)
+    cells = []
+    for cell_id, value in values.items():
+        cells.append({
+            'measInfoId': {'sMeasInfoId': cell_id},
+            'measTypes': {'sMeasTypesList': list(types)},
+            'measValuesList': [{'measObjInstId': cell_id, 'measResults': [
+                {'p': index + 1, 'sValue': str(value)} for index in range(len(types))]}],
+        })
+    return {'event': {'commonEventHeader': header, 'perf3gppFields': {'measDataCollection': {
+        'measuredEntityDn': dn, 'granularityPeriod': 900, 'measInfoList': cells}}}}
+
+
+@pytest.fixture
+def app_env(monkeypatch, tmp_path):
+    # Environment of an Application that never reaches a real endpoint
+    data_path = tmp_path / 'reports'
+    data_path.mkdir()
+    for name in ('LOAD_PREDICTOR', 'A1T_ADDRESS', 'SDN_CONTROLLER_ADDRESS'):
+        monkeypatch.setenv(name, '127.0.0.1')
+    for name in ('LOAD_PREDICTOR_PORT', 'A1T_PORT', 'SDN_CONTROLLER_PORT'):
+        monkeypatch.setenv(name, '9')
+    monkeypatch.setenv('LOAD_PREDICTOR_API', 'predict')
+    monkeypatch.setenv('SDN_CONTROLLER_USERNAME', 'test')
+    monkeypatch.setenv('SDN_CONTROLLER_PASSWORD', 'test')
+    monkeypatch.setenv('RANSIM_DATA_PATH', str(data_path))
+    monkeypatch.setenv('PRB_STORE_PATH', '')
+    monkeypatch.setenv('METRICS_PORT', '0')
+    monkeypatch.setenv('TOPOLOGY_CACHE_PATH', str(tmp_path / 'topology.json'))
+    monkeypatch.setenv('POLICY_REGISTRY_PATH', str(tmp_path / 'policies.json'))
+    return data_path
@@ -0,0 +1,51 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+from benchmark import AlternatingPredictor, StubServer, bench_make_decision, bench_read_data, benchmark_application
+from pm_generator import ReportGenerator
+from replay import LocalA1, LocalSdnc
+
+
+def test_read_data_reports_throughput_of_the_batch_only(app_env, tmp_path, monkeypatch):
+    monkeypatch.setenv('INGEST_WORKERS', '1')
+    monkeypatch.setenv('REPORT_COALESCE_INTERVAL_SEC', '0')
+    from main import Application
+    app = Application(10, 0, 3)
+    result = bench_read_data(app, str(tmp_path), ReportGenerator(3), 5)
+    assert result['params'] == {'cells': 3, 'reports': 5, 'workers': 1}
+    assert result['p50_ms'] is None and result['p99_ms'] is None
+    assert result['per_sec'] > 0
+    assert app.parser.pool is not None
+    app.close()
+    assert app.parser.pool is None
+
+
+def test_every_timed_decision_queries_and_switches(app_env, tmp_path, monkeypatch):
+    monkeypatch.setenv('CAPACITY_CELLS', '*')
+    monkeypatch.setenv('REPORT_COALESCE_INTERVAL_SEC', '0')
+    a1, sdnc, predictor = LocalA1(), LocalSdnc(), AlternatingPredictor()
+    stubs = [StubServer(a1), StubServer(sdnc), StubServer(predictor)]
+    app = benchmark_application(str(app_env), *(stub.port for stub in stubs), 3)
+    result = bench_make_decision(app, ReportGenerator(3), 4)
+    app.close()
+    for stub in stubs:
+        stub.close()
+    assert result['samples'] == 4
+    assert predictor.requests == 4
+    # Two decisions switch the 3 cells off (2 policies each), two switch them back on
+    assert sdnc.requests == 2 * 3
+    assert a1.requests == 1 + 2 * 3 * 2 + 2 * 3 * 2
@@ -0,0 +1,84 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import math
+
+import numpy as np
+import pytest
+
+from cell_store import CellStore
+
+
+def test_average_is_nan_until_the_window_is_full():
+    store = CellStore(3, 'on')
+    store.update('c1', 10)
+    store.update('c1', 20)
+    assert math.isnan(store['c1'].avg_prb_usage)
+    store.update('c1', 30)
+    assert store['c1'].avg_prb_usage == pytest.approx(20)
+
+
+def test_window_wraps_around_over_several_laps():
+    store = CellStore(3, 'on')
+    values = [5, 7, 11, 13, 17, 19, 23, 29]
+    for value in values:
+        store.update('c1', value)
+        recent = values[:values.index(value) + 1][-3:]
+        if len(recent) == 3:
+            assert store['c1'].avg_prb_usage == pytest.approx(sum(recent) / 3)
+
+
+def test_total_average_matches_a_rescan_while_rows_wrap_and_grow():
+    rng = np.random.default_rng(1)
+    store = CellStore(4, 'on', capacity=2)
+    windows = {}
+    for _ in range(500):
+        cell_id = f'c{rng.integers(0, 9)}'
+        value = float(rng.integers(0, 100))
+        store.update(cell_id, value)
+        windows[cell_id] = (windows.get(cell_id, []) + [value])[-4:]
+    assert len(store) == len(windows) > 2
+    assert all(len(window) == 4 for window in windows.values())
+    assert store.total_average() == pytest.approx(sum(sum(w) / 4 for w in windows.values()))
+    assert store.averages() == pytest.approx([sum(windows[i]) / 4 for i in store.ids])
+
+
+def test_total_average_is_nan_while_any_cell_is_filling():
+    store = CellStore(2, 'on')
+    for value in (1, 2):
+        store.update('c1', value)
+    store.update('c2', 5)
+    assert math.isnan(store.total_average())
+    store.update('c2', 7)
+    assert store.total_average() == pytest.approx(1.5 + 6)
+
+
+def test_observer_sees_new_cells_and_state_changes():
+    events = []
+
+    class Observer:
+        def cell_added(self, cell):
+            events.append(('added', cell.id))
+
+        def state_changed(self, cell, old, new):
+            events.append((cell.id, old, new))
+
+    store = CellStore(2, 'on', observer=Observer())
+    cell = store.update('c1', 1)
+    cell.state = 'on'
+    cell.state = 'off'
+    assert events == [('added', 'c1'), ('c1', 'on', 'off')]
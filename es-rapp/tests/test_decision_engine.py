@@ -0,0 +1,60 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from decision_engine import ALL_CELLS, DecisionEngine, parse_cell_group
+
+
+def test_parse_cell_group():
+    assert parse_cell_group(' * ') == ALL_CELLS
+    assert parse_cell_group('c1, c2,,') == {'c1', 'c2'}
+
+
+def test_thresholds_form_a_hysteresis_band():
+    engine = DecisionEngine(off_threshold=30, on_threshold=70)
+    cells = ['c1']
+    assert engine.decide(cells, 20) == (['c1'], [])
+    # Inside the band the cell stays locked
+    assert engine.decide(cells, 50) == ([], [])
+    assert engine.decide(cells, 70) == ([], [])
+    assert engine.decide(cells, 71) == ([], ['c1'])
+    assert engine.decide(cells, 50) == ([], [])
+    assert engine.decide(cells, 29) == (['c1'], [])
+
+
+def test_min_hold_cycles_delays_the_next_change():
+    engine = DecisionEngine(off_threshold=30, on_threshold=70, min_hold_cycles=2)
+    cells = ['c1']
+    assert engine.decide(cells, 10) == (['c1'], [])
+    assert engine.decide(cells, 90) == ([], [])
+    assert engine.decide(cells, 90) == ([], [])
+    assert engine.decide(cells, 90) == ([], ['c1'])
+
+
+def test_only_capacity_cells_are_locked():
+    engine = DecisionEngine(off_threshold=30, on_threshold=70, capacity_cells=ALL_CELLS, coverage_cells={'c2'})
+    assert engine.decide(['c1', 'c2'], 10) == (['c1'], [])
+    # Cells seen later join with their own state
+    assert engine.decide(['c1', 'c2', 'c3'], 10) == (['c3'], [])
+    assert engine.locked.tolist() == [True, False, True]
+
+
+def test_per_cell_forecasts_and_unknown_load():
+    engine = DecisionEngine(off_threshold=30, on_threshold=70, capacity_cells={'c1', 'c2', 'c3'})
+    assert engine.decide(['c1', 'c2', 'c3'], np.array([10, 50, np.nan])) == (['c1'], [])
+    assert engine.decide(['c1', 'c2', 'c3'], np.array([np.nan, 10, 10])) == (['c2', 'c3'], [])
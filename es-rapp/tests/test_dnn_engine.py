@@ -0,0 +1,38 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from dnn_engine import DenseNet
+
+
+def test_forward_pass_matches_the_dense_layers():
+    rng = np.random.default_rng(0)
+    kernel_1, bias_1 = rng.normal(size=(4, 3)).astype(np.float32), rng.normal(size=3).astype(np.float32)
+    kernel_2, bias_2 = rng.normal(size=(3, 2)).astype(np.float32), rng.normal(size=2).astype(np.float32)
+    net = DenseNet([(kernel_1, bias_1, 'relu'), (kernel_2, bias_2, 'linear')])
+    x = rng.normal(size=(5, 4)).astype(np.float32)
+    expected = np.maximum(x @ kernel_1 + bias_1, 0) @ kernel_2 + bias_2
+    assert net.input_dim == 4
+    np.testing.assert_allclose(net.predict(x), expected, rtol=1e-5, atol=1e-6)
+
+
+def test_weights_round_trip_through_npz(tmp_path):
+    kernel, bias = np.eye(2, dtype=np.float32), np.ones(2, dtype=np.float32)
+    path = tmp_path / 'weights.npz'
+    np.savez(path, activations=np.array(['linear']), kernel_0=kernel, bias_0=bias)
+    assert DenseNet.load(path).predict([[1, 2]]).tolist() == [[2.0, 3.0]]
@@ -0,0 +1,69 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import math
+
+import pytest
+
+from cell_store import CellStore
+from fleet_aggregates import FleetAggregates, parse_power_profiles
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_power_profiles():
+    assert parse_power_profiles('*=150:0, c1=300:20,') == {'*': (150.0, 0.0), 'c1': (300.0, 20.0)}
+    assert parse_power_profiles('c2=100') == {'c2': (100.0, 0.0)}
+
+
+def test_power_and_energy_follow_the_cell_states():
+    clock = Clock()
+    fleet = FleetAggregates(clock, parse_power_profiles('*=100:10,c1=300:20'), baseline_w=50, off_states={'off'})
+    cells = CellStore(1, 'on', observer=fleet)
+    cells.update('c1', 10)
+    cells.update('c2', 10)
+    assert fleet.power_w == fleet.power_all_on_w == 450
+    assert fleet.count('on') == 2
+
+    clock.now = 3600
+    cells['c1'].state = 'off'
+    assert fleet.energy_wh == pytest.approx(450)
+    assert fleet.power_w == 170 and fleet.power_all_on_w == 450
+    assert fleet.count('on') == 1 and fleet.count('off') == 1
+
+    clock.now = 5400
+    fleet.advance()
+    assert fleet.energy_wh == pytest.approx(450 + 85)
+    assert fleet.energy_saved_wh == pytest.approx(140)
+
+
+def test_average_prb_divides_by_the_cells_not_in_the_given_state():
+    fleet = FleetAggregates(Clock())
+    cells = CellStore(1, 'on', observer=fleet)
+    assert math.isnan(fleet.average_prb(cells, 'off'))
+    cells.update('c1', 30)
+    cells.update('c2', 50)
+    assert fleet.average_prb(cells, 'off') == pytest.approx(40)
+    cells['c2'].state = 'off'
+    cells.update('c2', 0)
+    assert fleet.average_prb(cells, 'off') == pytest.approx(30)
@@ -0,0 +1,103 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+from forecast_cache import ForecastCache, MODEL_VERSION_HEADER
+from replay import LocalEndpoint, LocalResponse, json_response
+import predictor_protocol
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_windows_are_quantised_into_the_key():
+    cache = ForecastCache(quantum=5)
+    assert cache.key([11, 14.9, 3], horizon=2) == cache.key([9, 15, 2.6], horizon=2)
+    assert cache.key([11, 14.9, 3], horizon=2) != cache.key([11, 14.9, 3], horizon=3)
+
+
+def test_entries_expire_and_are_evicted_least_recently_used_first():
+    clock = Clock()
+    cache = ForecastCache(max_entries=2, ttl_sec=60, clock=clock)
+    cache.put('a', [1])
+    cache.put('b', [2])
+    assert cache.get('a') == [1]
+    cache.put('c', [3])
+    assert cache.get('b') is None
+    clock.now = 61
+    assert cache.get('a') is None and cache.get('c') is None
+    assert cache.stats()['entries'] == 0
+    assert cache.hits == 1 and cache.misses == 3
+
+
+def test_new_model_version_drops_the_cached_forecasts():
+    cache = ForecastCache()
+    cache.set_version('v1')
+    old_key = cache.key([1, 2])
+    cache.put(old_key, [3])
+    cache.set_version('v1')
+    assert cache.get(old_key) == [3]
+    cache.set_version('v2')
+    assert cache.get(old_key) is None
+    assert cache.key([1, 2]) != old_key
+    assert not ForecastCache(max_entries=0).enabled
+
+
+class VersionedPredictor(LocalEndpoint):
+    # Forecasts the version number for every step
+    def __init__(self):
+        self.version = 1
+        self.queries = 0
+        self.checks = 0
+
+    def handle(self, method, path, headers=None, data=None, params=None, **kwargs):
+        response = json_response(200, {'ready': True})
+        if method == 'GET':
+            self.checks += 1
+        if method == 'POST':
+            self.queries += 1
+            response = LocalResponse(200, predictor_protocol.dumps([self.version]))
+        response.headers[MODEL_VERSION_HEADER] = f'v{self.version}'
+        return response
+
+
+def test_rapp_checks_the_served_version_before_using_the_cache(app_env):
+    from main import Application
+    app = Application(10, 0, 3)
+    app.predictor = predictor = VersionedPredictor()
+    now = [0.0]
+    app.clock = lambda: now[0]
+    for _ in range(app.prb_history.capacity):
+        app.prb_history.append(50)
+
+    assert app.query_predictor(slot=1) == [1]
+    assert app.query_predictor(slot=1) == [1]
+    # The version came with the forecast, no extra round trip for the hit
+    assert (predictor.queries, predictor.checks) == (1, 0)
+    # Hot-swap on the predictor: once a check is due, the cached forecast of v1 must not be used
+    predictor.version = 2
+    now[0] = app.version_check_sec
+    assert app.query_predictor(slot=1) == [2]
+    assert (predictor.queries, predictor.checks) == (2, 1)
+    assert app.forecast_cache.version == 'v2'
+    # The v2 forecast is cached under the v2 key
+    assert app.query_predictor(slot=1) == [2]
+    assert (predictor.queries, predictor.checks) == (2, 1)
@@ -0,0 +1,60 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from forecast_plan import ForecastPlan
+from load_history import LoadHistory
+from training_data import WindowDataset
+
+
+def test_plan_steps_are_the_training_target_steps():
+    # A perfect model answers with the training targets of the window; the plan must then
+    # give the actual next sample however many samples arrived since the query
+    series = np.arange(100, dtype=np.float32) * 3
+    look_back, horizon = 4, 6
+    _, targets = WindowDataset([series], look_back, horizon, batch_size=1000)[0]
+    history = LoadHistory(look_back)
+    for value in series[:look_back + 10]:
+        history.append(value)
+    start = history.appended
+    plan = ForecastPlan(tolerance=0.5)
+    assert plan.start(targets[start - look_back], start) == series[start]
+    for value in series[start:start + horizon - 1]:
+        history.append(value)
+        assert plan.next(history.window()[-1], history.appended) == series[history.appended]
+    history.append(series[history.appended])
+    assert plan.next(history.window()[-1], history.appended) is None
+
+
+def test_several_samples_per_decision_cycle():
+    plan = ForecastPlan(tolerance=1)
+    plan.start([10, 20, 30, 40, 50, 60], sample=100)
+    # No new sample since the query: still the forecast for the next one
+    assert plan.next(observed=5, sample=100) == 10
+    # Three samples later the fourth step is due, checked against the third
+    assert plan.next(observed=30, sample=103) == 40
+    assert plan.remaining(103) == [40, 50, 60]
+    assert plan.next(observed=60, sample=106) is None
+
+
+def test_plan_is_dropped_when_the_load_departs_from_it():
+    plan = ForecastPlan(tolerance=1)
+    plan.start([10, 20, 30], sample=0)
+    assert plan.next(observed=25, sample=1) is None
+    assert plan.next(observed=20, sample=1) is None
+    assert plan.remaining(1) == []
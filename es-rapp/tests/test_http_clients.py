@@ -0,0 +1,94 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from urllib3.exceptions import ConnectTimeoutError
+
+from http_clients import CappedRetry, EndpointClient, RequestRunner
+
+
+@pytest.fixture
+def unavailable_server():
+    # Answers every request with 503 and counts the requests per method
+    counts = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def respond(self):
+            counts[self.command] = counts.get(self.command, 0) + 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        do_GET = do_PUT = do_POST = respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', counts
+    server.shutdown()
+    server.server_close()
+
+
+def test_only_idempotent_methods_are_retried(unavailable_server):
+    url, counts = unavailable_server
+    client = EndpointClient(url, retries=2, backoff_sec=0.01)
+    assert client.get('/').status_code == 503
+    assert client.put('/').status_code == 503
+    assert client.post('/').status_code == 503
+    assert counts == {'GET': 3, 'PUT': 3, 'POST': 1}
+    client.close()
+
+
+def test_attempt_timeout_fits_the_deadline():
+    client = EndpointClient('http://127.0.0.1:1', timeout_sec=5, retries=3, backoff_sec=0.5, deadline_sec=8)
+    # Backoff sleeps of 1 + 2 s leave 1.25 s for each of the 4 attempts
+    assert sum(client.timeout_sec) == pytest.approx(1.25)
+    assert sum(EndpointClient('http://127.0.0.1:1', timeout_sec=2).timeout_sec) == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        EndpointClient('http://127.0.0.1:1', retries=6, backoff_sec=1, deadline_sec=3)
+
+
+def test_backoff_sleep_is_capped():
+    # Also run against the pinned urllib3 1.26, which has no backoff_max argument
+    retry = CappedRetry(total=5, backoff_factor=1, max_backoff_sec=3)
+    sleeps = []
+    for _ in range(5):
+        retry = retry.increment('GET', '/', error=ConnectTimeoutError())
+        sleeps.append(retry.get_backoff_time())
+    assert sleeps == [0, 2, 3, 3, 3]
+
+
+def test_runner_keeps_call_order_and_returns_exceptions():
+    def slow(value):
+        time.sleep(0.05 * (3 - value))
+        return value
+
+    def failing():
+        raise RuntimeError('down')
+
+    for use_async in (True, False):
+        runner = RequestRunner(use_async=use_async)
+        results = runner.run([lambda: slow(0), failing, lambda: slow(2)])
+        assert results[0] == 0 and results[2] == 2
+        assert isinstance(results[1], RuntimeError)
+        runner.close()
@@ -0,0 +1,56 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+import pytest
+
+from load_history import LoadHistory, QUERY_FEATURES
+
+
+def test_window_before_the_history_is_full():
+    history = LoadHistory(4)
+    history.append(1)
+    history.append(2)
+    assert len(history) == 2
+    assert history.window().tolist() == [1, 2]
+
+
+def test_window_keeps_the_latest_values_after_wrap_around():
+    history = LoadHistory(3)
+    for value in range(1, 8):
+        history.append(value)
+    assert len(history) == 3
+    assert history.window().tolist() == [5, 6, 7]
+
+
+def test_window_is_a_read_only_view():
+    history = LoadHistory(3)
+    for value in range(5):
+        history.append(value)
+    window = history.window()
+    assert np.shares_memory(window, history.buffer)
+    with pytest.raises(ValueError):
+        window[0] = 9
+
+
+def test_clear_and_look_back_capacity():
+    history = LoadHistory.for_look_back(8)
+    assert history.capacity == 8 - QUERY_FEATURES
+    history.append(1)
+    history.clear()
+    assert len(history) == 0
+    assert history.window().tolist() == []
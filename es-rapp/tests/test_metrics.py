@@ -0,0 +1,52 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import threading
+
+from metrics import Registry
+
+
+def test_render_and_snapshot():
+    registry = Registry()
+    counter = registry.counter('reports_total', 'Reports', ['result'])
+    histogram = registry.histogram('stage_seconds', 'Stages', ['stage'], buckets=(0.1, 1.0))
+    counter.labels('ok').inc(2)
+    histogram.labels('parse').observe(0.5)
+    text = registry.render()
+    assert 'reports_total{result="ok"} 2.0' in text
+    assert 'stage_seconds_bucket{stage="parse",le="0.1"} 0' in text
+    assert 'stage_seconds_bucket{stage="parse",le="1.0"} 1' in text
+    assert 'stage_seconds_bucket{stage="parse",le="+Inf"} 1' in text
+    assert registry.snapshot()['stage_seconds']['stage=parse'] == {'count': 1, 'sum': 0.5, 'mean': 0.5}
+
+
+def test_render_while_labels_are_added():
+    registry = Registry()
+    requests = registry.counter('requests_total', 'Requests', ['endpoint', 'result'])
+
+    def add_labels():
+        for n in range(2000):
+            requests.labels('a1', str(n)).inc()
+
+    thread = threading.Thread(target=add_labels)
+    thread.start()
+    while thread.is_alive():
+        registry.render()
+        registry.snapshot()
+    thread.join()
+    assert len(registry.snapshot()['requests_total']) == 2000
+    assert registry.render().count('requests_total{') == 2000
@@ -0,0 +1,65 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from micro_batcher import MicroBatcher
+
+
+def test_concurrent_windows_are_predicted_together():
+    calls = []
+
+    def predict(batch, tag):
+        calls.append(len(batch))
+        return batch.sum(axis=1, keepdims=True)
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit([value, 1.0]) for value in range(5)]
+    assert [future.result(5)[0] for future in futures] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert sum(calls) == 5 and len(calls) < 5
+    assert batcher.batched_windows == 5
+
+
+def test_window_that_cannot_be_stacked_is_predicted_on_its_own():
+    batcher = MicroBatcher(lambda batch, tag: batch * 2, max_batch_size=8, max_wait_ms=50)
+    good, odd = batcher.submit([1.0, 2.0]), batcher.submit([1.0])
+    other = batcher.submit([3.0, 4.0])
+    assert good.result(5).tolist() == [2.0, 4.0]
+    assert other.result(5).tolist() == [6.0, 8.0]
+    assert odd.result(5).tolist() == [2.0]
+
+
+def test_prediction_error_is_raised_to_the_caller():
+    def predict(batch, tag):
+        raise RuntimeError('model failed')
+
+    batcher = MicroBatcher(predict)
+    future = batcher.submit(np.zeros(2))
+    assert isinstance(future.exception(5), RuntimeError)
+
+
+def test_windows_with_different_tags_are_predicted_separately():
+    calls = []
+
+    def predict(batch, tag):
+        calls.append((tag, len(batch)))
+        return batch * tag
+
+    batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit([1.0], tag) for tag in (2, 3, 2)]
+    assert [future.result(5).tolist() for future in futures] == [[2.0], [3.0], [2.0]]
+    assert sum(size for _, size in calls) == 3
@@ -0,0 +1,85 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import os
+
+import numpy as np
+import pytest
+
+import model_artifacts
+
+
+class FakeDense:
+    # Just enough of a Keras Dense layer for dnn_engine.export_weights
+    def __init__(self, kernel, bias, activation):
+        self.name = 'dense'
+        self.weights = [np.asarray(kernel, dtype=np.float32), np.asarray(bias, dtype=np.float32)]
+        self.activation = activation
+
+    def get_config(self):
+        return {'activation': self.activation}
+
+    def get_weights(self):
+        return self.weights
+
+
+class FakeModel:
+    def __init__(self, scale):
+        self.layers = [FakeDense([[scale], [scale]], [0.0], 'linear')]
+
+    def save(self, path):
+        open(path, 'w').close()
+
+
+def test_save_and_load_with_the_numpy_engine(tmp_path):
+    version = model_artifacts.save(FakeModel(2.0), tmp_path, {'look_back': 2}, version='v1')
+    assert model_artifacts.latest_version(tmp_path) == 'v1'
+    assert model_artifacts.list_versions(tmp_path) == ['v1']
+    assert not os.path.exists(tmp_path / 'v1.tmp')
+    model, metadata = model_artifacts.load(tmp_path, engine='numpy')
+    assert metadata == {'look_back': 2, 'version': version}
+    assert model.predict(np.array([[1.0, 3.0]], dtype=np.float32)).tolist() == [[8.0]]
+
+
+def test_load_without_an_artifact(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        model_artifacts.load(tmp_path, engine='numpy')
+
+
+def test_candidate_is_not_made_latest(tmp_path):
+    model_artifacts.save(FakeModel(1.0), tmp_path, {}, version='v1')
+    model_artifacts.save(FakeModel(2.0), tmp_path, {}, version='v2', make_latest=False)
+    assert model_artifacts.latest_version(tmp_path) == 'v1'
+    assert model_artifacts.list_versions(tmp_path) == ['v1', 'v2']
+
+
+def test_rollback_walks_back_the_promotions(tmp_path):
+    for version in ('v1', 'v2', 'v3'):
+        model_artifacts.save(FakeModel(1.0), tmp_path, {}, version=version)
+    assert model_artifacts.promotion_history(tmp_path) == ['v1', 'v2', 'v3']
+    assert model_artifacts.rollback(tmp_path) == 'v2'
+    assert model_artifacts.rollback(tmp_path) == 'v1'
+    assert model_artifacts.latest_version(tmp_path) == 'v1'
+    with pytest.raises(ValueError):
+        model_artifacts.rollback(tmp_path)
+
+
+def test_history_starts_with_the_latest_of_an_older_artifact(tmp_path):
+    model_artifacts.save(FakeModel(1.0), tmp_path, {}, version='v1')
+    os.remove(tmp_path / model_artifacts.HISTORY_FILE)
+    model_artifacts.save(FakeModel(1.0), tmp_path, {}, version='v2')
+    assert model_artifacts.rollback(tmp_path) == 'v1'
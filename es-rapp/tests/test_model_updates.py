@@ -0,0 +1,64 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import pytest
+
+import model_artifacts
+from model_updates import ModelWatcher, Retrainer, train_first_model
+
+
+def test_watcher_swaps_to_a_new_latest_version(tmp_path):
+    swapped = []
+    watcher = ModelWatcher(str(tmp_path), lambda: 'v1', swapped.append, interval_sec=3600)
+    watcher.check()
+    assert swapped == []
+    model_artifacts.write_file(str(tmp_path), model_artifacts.LATEST_FILE, 'v1')
+    watcher.check()
+    assert swapped == []
+    model_artifacts.write_file(str(tmp_path), model_artifacts.LATEST_FILE, 'v2')
+    watcher.check()
+    assert swapped == ['v2']
+    watcher.stop()
+
+
+def test_failed_swap_is_logged_and_retried(tmp_path):
+    calls = []
+
+    def swap(version):
+        calls.append(version)
+        raise ValueError('invalid model')
+
+    model_artifacts.write_file(str(tmp_path), model_artifacts.LATEST_FILE, 'v2')
+    watcher = ModelWatcher(str(tmp_path), lambda: 'v1', swap, interval_sec=3600)
+    watcher.check()
+    watcher.check()
+    assert calls == ['v2', 'v2']
+    watcher.stop()
+
+
+def test_first_model_training_failure_is_raised(tmp_path):
+    with pytest.raises(RuntimeError):
+        train_first_model(str(tmp_path / 'missing.csv'), str(tmp_path / 'models'))
+    assert model_artifacts.latest_version(str(tmp_path / 'models')) is None
+
+
+def test_retrainer_can_run_without_a_thread(tmp_path):
+    retrainer = Retrainer(str(tmp_path / 'load.csv'), str(tmp_path), interval_sec=3600, start=False)
+    assert not retrainer.thread.is_alive()
+    retrainer.stop()
+    # The loop of the caller ends once stopped
+    retrainer.run()
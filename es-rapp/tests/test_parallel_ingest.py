@@ -0,0 +1,64 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import math
+
+import pytest
+
+from conftest import cell_report
+from parallel_ingest import ParseFailure, ReportParser
+from pm_extract import PRB_TOT_DL
+
+
+@pytest.fixture
+def report_files(tmp_path):
+    paths = []
+    for n in range(9):
+        path = tmp_path / f'A{n:02d}.json'
+        path.write_text(json.dumps(cell_report({f'c{n}': n, 'c99': 99})))
+        paths.append(str(path))
+    (tmp_path / 'A04.json').write_text('{"event":')
+    paths.insert(6, str(tmp_path / 'gone.json'))
+    return paths
+
+
+def summarise(results):
+    summary = []
+    for _, result in results:
+        if result is None or isinstance(result, ParseFailure):
+            summary.append(type(result).__name__)
+        else:
+            summary.append((result.cell_ids, [values[0] for values in result.values]))
+    return summary
+
+
+def test_workers_return_the_same_results_in_file_order(report_files):
+    serial = ReportParser([PRB_TOT_DL])
+    parallel = ReportParser([PRB_TOT_DL, 'DRB.UEThpDl'], workers=2, optional=['DRB.UEThpDl'])
+    try:
+        expected = summarise(serial.parse(report_files))
+        results = parallel.parse(report_files)
+        assert summarise(results) == expected
+        assert expected[4] == 'ParseFailure' and expected[6] == 'NoneType'
+        assert expected[0] == (['c0', 'c99'], [0.0, 99.0])
+        # Optional counters are passed to the workers as well
+        assert math.isnan(results[0][1].values[0][1])
+        assert all(seconds >= 0 for seconds, _ in results)
+    finally:
+        parallel.close()
+    assert parallel.pool is None
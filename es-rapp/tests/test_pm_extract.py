@@ -0,0 +1,67 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import math
+
+from conftest import cell_report
+from pm_extract import PmExtractor, PRB_TOT_DL, MISSING_COUNTERS
+
+
+def meas_info(report, index=0):
+    return report['event']['perf3gppFields']['measDataCollection']['measInfoList'][index]
+
+
+def test_values_follow_the_counter_positions():
+    extractor = PmExtractor([PRB_TOT_DL, 'RRU.PrbTotUl'])
+    info = meas_info(cell_report({'c1': 0}, types=('RRU.PrbTotUl', 'X', PRB_TOT_DL)))
+    info['measValuesList'][0]['measResults'] = [{'p': 1, 'sValue': '3'}, {'p': 2, 'sValue': '4'},
+                                                {'p': 3, 'sValue': '5'}]
+    assert extractor.values('du1', 'Cell', info) == [5.0, 3.0]
+
+
+def test_layout_is_reused_and_checked_against_the_list():
+    extractor = PmExtractor([PRB_TOT_DL])
+    first = extractor.layout('du1', 'Cell', ['A', PRB_TOT_DL])
+    assert extractor.layout('du1', 'Cell', ['B', PRB_TOT_DL]) is first
+    # Same source and length, another order: resolved again instead of reading the wrong position
+    assert extractor.layout('du1', 'Cell', [PRB_TOT_DL, 'A']) == (0,)
+    assert extractor.layout('du1', 'Cell', ['A', PRB_TOT_DL]) == (1,)
+    assert len(extractor.layouts) == 1
+
+
+def test_counter_that_appears_in_a_known_layout_is_found():
+    extractor = PmExtractor([PRB_TOT_DL])
+    assert extractor.layout('du1', 'Cell', ['A', 'B']) == (-1,)
+    assert extractor.layout('du1', 'Cell', ['A', PRB_TOT_DL]) == (1,)
+
+
+def test_missing_optional_counter_is_nan_and_keeps_the_prb():
+    extractor = PmExtractor([PRB_TOT_DL, 'DRB.UEThpDl'], optional=['DRB.UEThpDl'])
+    values = extractor.values('du1', 'Cell', meas_info(cell_report({'c1': 42})))
+    assert values[0] == 42.0 and math.isnan(values[1])
+    assert extractor.missing(meas_info(cell_report({'c1': 42}))) == []
+
+
+def test_missing_required_counter_rejects_the_report():
+    extractor = PmExtractor([PRB_TOT_DL])
+    report = cell_report({'c1': 1, 'c2': 2})
+    meas_info(report, 1)['measTypes']['sMeasTypesList'] = ['RRU.PrbTotUl', 'Other']
+    samples = extractor.samples(report)
+    assert samples.rejected == MISSING_COUNTERS
+    assert samples.missing == [PRB_TOT_DL]
+    # Cells before the incomplete one are kept
+    assert samples.cell_ids == ['c1']
@@ -0,0 +1,88 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+from policy_registry import PolicyRegistry
+
+
+def test_allocate_skips_ids_in_use_and_reuses_released_ones():
+    registry = PolicyRegistry(1000)
+    registry.reconcile(['1000', '1002', '7', 'other'], now=0)
+    assert registry.allocate('c1') == 1001
+    assert registry.allocate('c1') == 1003
+    assert registry.allocate('c2') == 1004
+    registry.release(1001)
+    assert registry.allocate('c2') == 1001
+    assert sorted(registry.owned_by('c2')) == [1001, 1004]
+
+
+def test_reconcile_rebuilds_the_mirror():
+    registry = PolicyRegistry(1000)
+    assert registry.needs_reconcile(0, 300)
+    registry.reconcile([], now=0)
+    first = registry.allocate('c1')
+    assert not registry.needs_reconcile(100, 300)
+    registry.forget(first)
+    assert registry.needs_reconcile(100, 300)
+    # The policy did make it to A1
+    registry.reconcile([str(first)], now=100)
+    assert registry.allocate('c1') == first + 1
+    assert registry.needs_reconcile(400, 300)
+
+
+def test_only_own_policies_are_cleaned_up(tmp_path):
+    state_path = str(tmp_path / 'policies.json')
+    registry = PolicyRegistry(1000, state_path)
+    # 1000 and 1001 belong to another rApp sharing the id range
+    registry.reconcile(['1000', '1001'], now=0)
+    own = [registry.allocate('c1'), registry.allocate('c1')]
+    assert registry.rapp_policies() == own
+    # Nothing is written until the batch is saved
+    assert PolicyRegistry(1000, state_path).rapp_policies() == []
+    registry.save()
+
+    restarted = PolicyRegistry(1000, state_path)
+    assert restarted.rapp_policies() == own
+    # One of them was deleted while the rApp was down
+    restarted.reconcile(['1000', '1001', str(own[1])], now=0)
+    assert restarted.rapp_policies() == [own[1]]
+    restarted.release(own[1])
+    restarted.save()
+    assert PolicyRegistry(1000, state_path).rapp_policies() == []
+
+
+def test_unknown_outcome_keeps_the_id_for_cleanup(tmp_path):
+    state_path = str(tmp_path / 'policies.json')
+    registry = PolicyRegistry(1000, state_path)
+    registry.reconcile([], now=0)
+    policy_id = registry.allocate('c1')
+    registry.save()
+    registry.forget(policy_id)
+    assert registry.owned_by('c1') == []
+    assert PolicyRegistry(1000, state_path).rapp_policies() == [policy_id]
+
+
+def test_policies_are_indexed_by_cell():
+    registry = PolicyRegistry(1000)
+    registry.reconcile([], now=0)
+    ids = [registry.allocate(cell_id) for cell_id in ('c1', 'c2', 'c1')]
+    assert registry.owned_by('c1') == [ids[0], ids[2]]
+    registry.forget(ids[0])
+    registry.release(ids[1])
+    assert registry.owned_by('c1') == [ids[2]] and registry.owned_by('c2') == []
+    registry.reconcile([str(policy_id) for policy_id in ids], now=1)
+    # Ownership of ids A1 still lists survives the rebuild, unknown owners are not guessed
+    assert registry.owned_by('c1') == [ids[2]]
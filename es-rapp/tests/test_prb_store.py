@@ -0,0 +1,70 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from prb_store import ColumnTable, PrbStore
+
+COLUMNS = {'time': '<f8', 'value': '<f4'}
+
+
+def test_open_truncates_columns_to_their_common_length(tmp_path):
+    table = ColumnTable(str(tmp_path), COLUMNS)
+    table.append(time=[1.0, 2.0], value=[10, 20])
+    table.close()
+    # Crash between the writes of two columns: one more time value than values
+    with open(table.segment_path(0, 'time'), 'ab') as file:
+        file.write(np.array([3.0], '<f8').tobytes())
+    # and half a value
+    with open(table.segment_path(0, 'value'), 'ab') as file:
+        file.write(b'\x00\x00')
+
+    table = ColumnTable(str(tmp_path), COLUMNS)
+    assert table.rows == 2
+    table.append(time=[4.0], value=[40])
+    columns = next(iter(table))
+    assert columns['time'].tolist() == [1.0, 2.0, 4.0]
+    assert columns['value'].tolist() == [10, 20, 40]
+    table.close()
+
+
+def test_segments_roll_and_tail_spans_them(tmp_path):
+    table = ColumnTable(str(tmp_path), COLUMNS, segment_rows=3)
+    for start in range(0, 8, 2):
+        table.append(time=[start, start + 1], value=[start, start + 1])
+    assert table.segments == [0, 1, 2, 3]
+    assert table.tail(5)['time'].tolist() == [3, 4, 5, 6, 7]
+    table.drop_before('time', 4)
+    assert table.segments == [2, 3]
+    reader = ColumnTable(str(tmp_path), COLUMNS, segment_rows=3, readonly=True)
+    assert [len(columns['time']) for columns in reader] == [2, 2]
+    table.close()
+
+
+def test_store_survives_a_restart(tmp_path):
+    store = PrbStore(str(tmp_path))
+    for now in range(10):
+        store.append_cells(now, ['c1', 'c2'], [now, 100 + now])
+        store.append_fleet(now, np.nan if now < 2 else now * 2)
+    store.close()
+
+    store = PrbStore(str(tmp_path))
+    recent = dict((cell_id, values.tolist()) for cell_id, values in store.recent_cells(since=5, per_cell=3))
+    assert recent == {'c1': [7, 8, 9], 'c2': [107, 108, 109]}
+    assert store.recent_fleet(since=7, count=5).tolist() == [14, 16, 18]
+    assert np.isnan(next(store.fleet_load())[:2]).all()
+    store.close()
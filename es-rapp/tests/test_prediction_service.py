@@ -0,0 +1,71 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+import pytest
+
+import prediction_rapp_v1 as predictor
+from forecast_cache import ForecastCache, MODEL_VERSION_HEADER
+
+
+class ConstantModel:
+    def __init__(self, value):
+        self.value = value
+
+    def predict(self, X, verbose=0):
+        return np.full((len(X), 1), self.value, dtype=np.float32)
+
+
+class SwappingCache(ForecastCache):
+    # Swaps in the next model on the first lookup, like a model update landing
+    # after a request was admitted but before its forecast is made
+    def __init__(self, swap_to):
+        super().__init__(16, 60, 1)
+        self.swap_to = swap_to
+
+    def get(self, key):
+        if self.swap_to is not None:
+            predictor.serving, self.swap_to = self.swap_to, None
+            self.set_version(predictor.serving.metadata['version'])
+        return super().get(key)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(predictor, 'serving', predictor.Serving(ConstantModel(100.0), {'version': '1', 'look_back': 2}))
+    cache = SwappingCache(predictor.Serving(ConstantModel(200.0), {'version': '2', 'look_back': 2}))
+    cache.set_version('1')
+    monkeypatch.setattr(predictor, 'forecast_cache', cache)
+    monkeypatch.setattr(predictor, 'batcher', None)
+    return predictor.app.test_client()
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_forecast_comes_from_the_model_the_request_started_with(service, monkeypatch, batched):
+    if batched:
+        monkeypatch.setattr(predictor, 'batcher', predictor.MicroBatcher(predictor.model_predict, 8, 1))
+    response = service.post('/predict', json=[1, 2, 3])
+    assert response.headers[MODEL_VERSION_HEADER] == '1'
+    assert response.get_json() == [100.0]
+    # Cached under the version that made it, not the one swapped in meanwhile
+    cache = predictor.forecast_cache
+    assert cache.get(cache.key([2, 3], version='1'))[0] == 100.0
+    assert cache.get(cache.key([2, 3])) is None
+
+    response = service.post('/predict', json=[1, 2, 3])
+    assert response.headers[MODEL_VERSION_HEADER] == '2'
+    assert response.get_json() == [200.0]
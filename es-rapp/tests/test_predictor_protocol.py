@@ -0,0 +1,43 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+import pytest
+
+import predictor_protocol as protocol
+
+
+@pytest.mark.parametrize('content_type', protocol.supported_types())
+def test_query_round_trip(content_type):
+    query = np.array([10, 20, 30, 5, 0])
+    body = protocol.dumps(query, content_type)
+    assert np.asarray(protocol.loads(body, content_type), dtype=np.float32).tolist() == [10, 20, 30, 5, 0]
+
+
+def test_float32_is_packed_little_endian():
+    assert protocol.dumps([1.0], protocol.FLOAT32) == b'\x00\x00\x80\x3f'
+
+
+def test_negotiate_picks_the_first_supported_type():
+    assert protocol.negotiate('text/html, application/x-float32;q=0.9, application/json') == protocol.FLOAT32
+    assert protocol.negotiate('text/html') == protocol.JSON
+    assert protocol.negotiate(None) == protocol.JSON
+
+
+def test_unsupported_type_is_rejected():
+    with pytest.raises(ValueError):
+        protocol.loads(b'', 'text/plain')
@@ -0,0 +1,82 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+import requests
+
+SERVER = textwrap.dedent('''
+    import os, sys
+    from flask import Flask
+    from prefork_server import PreforkServer
+
+    app = Flask(__name__)
+
+    @app.route('/')
+    def index():
+        return str(os.getpid())
+
+    def background():
+        # Appends its pid and exits, to be restarted
+        with open(sys.argv[2], 'a') as file:
+            file.write(f'{os.getpid()}\\n')
+
+    PreforkServer(app, '127.0.0.1', int(sys.argv[1]), 1, background=background).serve()
+''')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pid(port):
+    try:
+        return int(requests.get(f'http://127.0.0.1:{port}/', timeout=1).text)
+    except requests.ConnectionError:
+        return None
+
+
+def wait_for(condition, timeout_sec=10):
+    deadline = time.monotonic() + timeout_sec
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.05)
+
+
+def test_background_runs_in_its_own_restarted_process(tmp_path):
+    port, runs = free_port(), tmp_path / 'runs'
+    server = subprocess.Popen([sys.executable, '-c', SERVER, str(port), str(runs)],
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        wait_for(lambda: runs.exists() and len(runs.read_text().splitlines()) >= 2)
+        wait_for(lambda: worker_pid(port) is not None)
+        worker = worker_pid(port)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(10) == 0
+    pids = [int(line) for line in runs.read_text().splitlines()]
+    assert len(set(pids)) == len(pids)
+    assert server.pid not in pids and worker not in pids
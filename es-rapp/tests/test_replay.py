@@ -0,0 +1,56 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+from pm_generator import ReportGenerator
+from replay import ReplaySource, VirtualClock, replay, replay_application, report_paths
+
+
+def run_replay(source_dir, data_path):
+    app = replay_application(str(data_path), 10.0, 120.0, 3)
+    source = ReplaySource(report_paths(str(source_dir), ''), app.clock, 10.0)
+    return replay(app, source)
+
+
+def test_replay_is_deterministic(app_env, tmp_path, monkeypatch):
+    monkeypatch.setenv('CAPACITY_CELLS', '*')
+    source_dir = tmp_path / 'recording'
+    source_dir.mkdir()
+    generator = ReportGenerator(4)
+    for _ in range(120):
+        generator.write(str(source_dir))
+
+    first = run_replay(source_dir, app_env)
+    second = run_replay(source_dir, app_env)
+    assert first['reports'] == 120
+    assert first['decisions'] > 0
+    # Recorded reports are kept
+    assert len(list(source_dir.iterdir())) == 120
+    for name in ('decisions', 'predictor_queries', 'a1_requests', 'sdnc_requests', 'virtual_sec', 'energy_wh',
+                 'energy_saved_wh'):
+        assert first[name] == second[name]
+
+
+def test_source_releases_reports_on_the_virtual_clock():
+    clock = VirtualClock(100.0)
+    source = ReplaySource(['a', 'b', 'c'], clock, 10.0)
+    assert source.drain() == [('a', 100.0)]
+    clock.advance(25)
+    assert source.drain() == [('b', 110.0), ('c', 120.0)]
+    source.retry('b', 110.0)
+    assert not source.exhausted()
+    assert source.drain() == [('b', 110.0)]
+    assert source.exhausted()
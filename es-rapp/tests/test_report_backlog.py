@@ -0,0 +1,71 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+from pm_extract import MISSING_COUNTERS, PmSamples
+from report_backlog import BacklogPolicy
+
+
+def samples(source, epoch_sec, values):
+    return PmSamples(source, 'dn', epoch_sec, list(values), [[value] for value in values.values()])
+
+
+def test_stale_reports_are_shed():
+    policy = BacklogPolicy(max_age_sec=300)
+    assert policy.stale(received_sec=0, now=301)
+    assert not policy.stale(received_sec=0, now=300)
+    assert not BacklogPolicy().stale(received_sec=0, now=10 ** 6)
+
+
+def test_reports_of_one_interval_are_merged_into_the_mean():
+    policy = BacklogPolicy(interval_sec=60)
+    reports = [(samples('du1', 10, {'c1': 10, 'c2': 20}), 11),
+               (samples('du2', 20, {'c3': 5}), 21),
+               (samples('du1', 50, {'c1': 30}), 51),
+               (samples('du1', 70, {'c1': 50}), 71)]
+    merged, dropped = policy.coalesce(reports, now=1000)
+    assert dropped == 1
+    assert [(s.source_name, s.epoch_sec, s.cell_ids, s.values) for s in merged] == [
+        ('du1', 50, ['c1', 'c2'], [[20.0], [20.0]]),
+        ('du2', 20, ['c3'], [[5]]),
+        ('du1', 70, ['c1'], [[50]]),
+    ]
+
+
+def test_rejected_reports_are_passed_on_and_merging_can_be_off():
+    rejected = PmSamples('du1', 'dn', 10)
+    rejected.rejected = MISSING_COUNTERS
+    reports = [(samples('du1', 10, {'c1': 1}), 0), (rejected, 0), (samples('du1', 20, {'c1': 3}), 0)]
+    merged, dropped = BacklogPolicy(interval_sec=60).coalesce(reports, now=1000)
+    assert dropped == 1
+    assert merged[1] is rejected and merged[0].values == [[2.0]]
+    assert BacklogPolicy().coalesce(reports, now=1000) == ([s for s, _ in reports], 0)
+
+
+def test_received_time_is_used_without_an_interval_end():
+    policy = BacklogPolicy(interval_sec=60)
+    merged, dropped = policy.coalesce([(samples('du1', 0, {'c1': 1}), 30), (samples('du1', 0, {'c1': 3}), 90)], now=1000)
+    assert dropped == 0 and len(merged) == 2
+
+
+def test_fresh_reports_are_not_merged():
+    policy = BacklogPolicy(interval_sec=60, lag_sec=60)
+    # Consecutive 10 s reports, read together after a slow cycle
+    reports = [(samples('du1', 1000030, {'c1': 10}), 1000031), (samples('du1', 1000040, {'c1': 30}), 1000041)]
+    merged, dropped = policy.coalesce(reports, now=1000060)
+    assert dropped == 0 and [s.values for s in merged] == [[[10]], [[30]]]
+    merged, dropped = policy.coalesce(reports, now=1000200)
+    assert dropped == 1 and merged[0].values == [[20.0]]
@@ -0,0 +1,60 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import os
+
+from conftest import cell_report
+from report_watcher import ReportWatcher
+
+
+def test_drain_returns_reports_oldest_first_and_skips_hidden_files(tmp_path):
+    for name, mtime in (('b.json', 200), ('a.json', 100), ('.upload.json', 50)):
+        (tmp_path / name).write_text('{}')
+        os.utime(tmp_path / name, (mtime, mtime))
+    watcher = ReportWatcher(str(tmp_path), 0.01, use_inotify=False)
+    assert watcher.drain() == [(str(tmp_path / 'a.json'), 100), (str(tmp_path / 'b.json'), 200)]
+    assert watcher.drain() == []
+
+
+def test_retried_report_is_drained_again(tmp_path):
+    watcher = ReportWatcher(str(tmp_path), 0.01)
+    watcher.retry(str(tmp_path / 'late.json'), 5.0)
+    assert watcher.wait(0.01)
+    assert watcher.drain() == [(str(tmp_path / 'late.json'), 5.0)]
+    assert not watcher.wait(0.01)
+
+
+def test_unreadable_report_gets_one_more_chance_with_inotify(app_env):
+    from main import Application
+    app = Application(10, 0, 3)
+    app.watcher = ReportWatcher(str(app_env), 0.01, use_inotify=True)
+    (app_env / 'bad.json').write_text('{"event":')
+    (app_env / 'good.json').write_text(json.dumps(cell_report({'c1': 10})))
+
+    assert app.watcher.wait(1.0)
+    assert [samples.cell_ids for samples in app.read_data()] == [['c1']]
+    assert app.unreadable_reports == {str(app_env / 'bad.json')}
+    assert (app_env / 'bad.json').exists()
+
+    # No new inotify event comes for the complete file, the retry must bring it back
+    assert app.watcher.wait(0.05)
+    assert app.read_data() == []
+    assert app.unreadable_reports == set()
+    assert not (app_env / 'bad.json').exists()
+    snapshot = app.metrics.registry.snapshot()['es_rapp_reports_total']
+    assert snapshot['result=retried'] == 1 and snapshot['result=dropped'] == 1
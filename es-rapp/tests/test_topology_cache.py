@@ -0,0 +1,113 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import threading
+import time
+
+from http_clients import RequestRunner
+from topology_cache import TopologyCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, etag=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = {'ETag': etag} if etag else {}
+
+    def json(self):
+        return self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f'HTTP {self.status_code}')
+
+
+class FakeSdnc:
+    # ManagedElement id -> {cell name: objectInstance}; answers 304 to a matching If-None-Match
+    def __init__(self, elements):
+        self.elements = elements
+        self.requests = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get(self, path, headers=None):
+        self.gate.wait(5)
+        me = path.rsplit('=', 1)[1]
+        self.requests.append((me, dict(headers or {})))
+        if me not in self.elements:
+            return FakeResponse(503)
+        etag = f'"{hash(json.dumps(self.elements[me], sort_keys=True))}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        cells = [{'viavi-attributes': {'cellName': name}, 'objectInstance': url}
+                 for name, url in self.elements[me].items()]
+        return FakeResponse(200, {'GnbDuFunction': [{'NrCellDu': cells}]}, etag)
+
+
+def wait_for(condition, timeout_sec=5):
+    deadline = time.monotonic() + timeout_sec
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_cold_start_fetches_every_element_and_persists(tmp_path):
+    sdnc = FakeSdnc({'1': {'c1': 'url1'}, '2': {'c2': 'url2'}})
+    topology = TopologyCache(sdnc, RequestRunner(use_async=False), ['1', '2'], str(tmp_path / 'topology.json'),
+                             refresh_sec=0)
+    assert topology.start()
+    assert topology.get('c1') == 'url1' and topology.get('c2') == 'url2'
+    with open(tmp_path / 'topology.json') as file:
+        assert json.load(file)['managed_elements']['2'] == {'c2': 'url2'}
+
+
+def test_warm_start_does_not_wait_for_sdnc(tmp_path):
+    cache_path = tmp_path / 'topology.json'
+    cache_path.write_text(json.dumps({'managed_elements': {'1': {'c1': 'cached'}}}))
+    sdnc = FakeSdnc({'1': {'c1': 'url1'}})
+    sdnc.gate.clear()
+    topology = TopologyCache(sdnc, RequestRunner(use_async=False), ['1'], str(cache_path), refresh_sec=0)
+    assert topology.start()
+    assert topology.get('c1') == 'cached'
+    sdnc.gate.set()
+    assert wait_for(lambda: topology.get('c1') == 'url1')
+
+
+def test_unknown_cell_wakes_the_refresh_without_blocking(tmp_path):
+    sdnc = FakeSdnc({'1': {'c1': 'url1'}})
+    topology = TopologyCache(sdnc, RequestRunner(use_async=False), ['1'], '', refresh_sec=0, miss_refresh_sec=0)
+    topology.start()
+    sdnc.elements['1'] = {'c1': 'url1', 'c2': 'url2'}
+    sdnc.gate.clear()
+    started = time.monotonic()
+    assert topology.get('c2') is None
+    assert time.monotonic() - started < 1
+    sdnc.gate.set()
+    assert wait_for(lambda: topology.get('c2') == 'url2')
+
+
+def test_unchanged_and_failed_elements_keep_their_cells():
+    sdnc = FakeSdnc({'1': {'c1': 'url1'}, '2': {'c2': 'url2'}})
+    topology = TopologyCache(sdnc, RequestRunner(use_async=False), ['1', '2'], '', refresh_sec=0)
+    assert topology.refresh()
+    del sdnc.elements['2']
+    sdnc.requests.clear()
+    assert topology.refresh()
+    # Element 1 was asked conditionally and answered 304, element 2 failed
+    assert 'If-None-Match' in sdnc.requests[0][1]
+    assert topology.cell_urls == {'c1': 'url1', 'c2': 'url2'}
@@ -0,0 +1,68 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import numpy as np
+
+from prb_store import PrbStore
+from training_data import WindowDataset, csv_series, split_series, store_series, tail_series
+
+
+def test_csv_series_is_memory_mapped_across_chunks(tmp_path):
+    path = tmp_path / 'load.csv'
+    path.write_text('Time,Load\n' + ''.join(f'{i},{i * 1.5}\n' for i in range(10)))
+    series, = csv_series(str(path), chunk_rows=3)
+    assert isinstance(series, np.memmap)
+    assert series.tolist() == [i * 1.5 for i in range(10)]
+
+
+def test_empty_csv(tmp_path):
+    path = tmp_path / 'load.csv'
+    path.write_text('Time,Load\n')
+    assert len(csv_series(str(path))[0]) == 0
+
+
+def test_windows_never_cross_series():
+    first, second = np.arange(5, dtype=np.float32), np.arange(100, 104, dtype=np.float32)
+    data = WindowDataset([first, second, np.arange(2)], look_back=2, horizon=1, batch_size=3)
+    assert data.windows == 3 + 2
+    assert len(data) == 2
+    x = np.concatenate([data[i][0] for i in range(len(data))])
+    y = np.concatenate([data[i][1] for i in range(len(data))])
+    assert x.tolist() == [[0, 1], [1, 2], [2, 3], [100, 101], [101, 102]]
+    assert y.tolist() == [[2], [3], [4], [102], [103]]
+
+
+def test_shuffled_epoch_covers_every_window_once():
+    data = WindowDataset([np.arange(50, dtype=np.float32)], look_back=3, horizon=2, batch_size=7, shuffle=True, seed=1)
+    starts = np.concatenate([data[i][0][:, 0] for i in range(len(data))])
+    assert sorted(starts.tolist()) == list(range(46))
+
+
+def test_per_cell_series_from_the_store(tmp_path):
+    store = PrbStore(str(tmp_path))
+    for now in range(6):
+        store.append_cells(now, ['c1', 'c2'], [now, 10 * now])
+        store.append_fleet(now, np.nan if now == 2 else now)
+    store.close()
+    fleet = store_series(str(tmp_path))
+    assert [s.tolist() for s in fleet] == [[0, 1], [3, 4, 5]]
+    cells = store_series(str(tmp_path), per_cell=True)
+    data = WindowDataset(cells, look_back=2, horizon=1, batch_size=100)
+    assert data[0][1].ravel().tolist() == [2, 3, 4, 5, 20, 30, 40, 50]
+    head, rest = split_series(cells[1], 4)
+    assert WindowDataset([head], 2, 1)[0][0].tolist() == [[0, 10], [10, 20]]
+    assert WindowDataset([tail_series(cells[1], 3)], 2, 1)[0][0].tolist() == [[30, 40]]
@@ -0,0 +1,152 @@
+#  ============LICENSE_START===============================================
+#  Copyright (C) 2024 Intel, Rimedo Labs and Tietoevry. All rights reserved.
+#  SPDX-License-Identifier: Apache-2.0
+#  ========================================================================
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#  ============LICENSE_END=================================================
+
+import json
+import logging
+import os
+import threading
+import time
+from functools import partial
+
+log = logging.getLogger('main')
+
+
+class TopologyCache:
+    # Cell name -> SDN-C objectInstance map for one or more ManagedElements.
+    # The map is persisted to cache_path so a restart can go ahead with the last
+    # known topology, and is refreshed by a background thread every refresh_sec
+    # (only on demand if refresh_sec is 0). A refresh GETs the CM of every
+    # ManagedElement (concurrently through runner); SDN-C has no change feed, so
+    # the only saving is a conditional GET with the ETag of the last answer when
+    # SDN-C provides one, which skips the transfer and parsing of an unchanged
+    # element. Elements that could not be fetched keep their previous cells.
+    # Lookups never wait for SDN-C: an unknown cell only wakes the thread.
+    def __init__(self, sdnc, runner, managed_elements, cache_path: str = '',
+                 refresh_sec: float = 600, miss_refresh_sec: float = 30):
+        self.sdnc = sdnc
+        self.runner = runner
+        self.managed_elements = [me.strip() for me in managed_elements if me.strip()]
+        self.cache_path = cache_path
+        self.refresh_sec = refresh_sec
+        self.miss_refresh_sec = miss_refresh_sec
+        self.elements = {}
+        self.etags = {}
+        self.cell_urls = {}
+        self.refreshed_at = 0.0
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread = None
+
+    def start(self):
+        # Returns True when a topology is available, from disk or from SDN-C
+        self.load()
+        if self.cell_urls:
+            # Warm start: go ahead with the cached topology, refresh it in the background
+            self.wakeup.set()
+        else:
+            self.refresh()
+        self.thread = threading.Thread(target=self.run, name='topology', daemon=True)
+        self.thread.start()
+        return bool(self.cell_urls)
+
+    def get(self, cell_id):
+        url = self.cell_urls.get(cell_id)
+        if url is None and time.monotonic() - self.refreshed_at >= self.miss_refresh_sec:
+            # Unknown cell, maybe added since the last refresh
+            self.wakeup.set()
+        return url
+
+    def run(self):
+        while True:
+            self.wakeup.wait(self.refresh_sec if self.refresh_sec > 0 else None)
+            self.wakeup.clear()
+            self.refresh()
+
+    def fetch(self, managed_element):
+        # Cells of the element, or None if it has not changed since the last fetch
+        etag = self.etags.get(managed_element)
+        headers = {'If-None-Match': etag} if etag and managed_element in self.elements else {}
+        response = self.sdnc.get(f'/O1/CM/ManagedElement={managed_element}', headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        self.etags[managed_element] = response.headers.get('ETag')
+        cells = {}
+        for data in response.json()['GnbDuFunction']:
+            for cell_du in data['NrCellDu']:
+                cells[cell_du['viavi-attributes']['cellName']] = cell_du['objectInstance']
+        return cells
+
+    def refresh(self):
+        with self.lock:
+            self.refreshed_at = time.monotonic()
+            results = self.runner.run([partial(self.fetch, me) for me in self.managed_elements])
+            changed = False
+            fetched = 0
+            for me, cells in zip(self.managed_elements, results):
+                if isinstance(cells, Exception):
+                    log.error(f'Unable to fetch ManagedElement={me}: {cells}')
+                    continue
+                fetched += 1
+                if cells is None:
+                    continue
+                old = self.elements.get(me, {})
+                if cells != old:
+                    added = cells.keys() - old.keys()
+                    removed = old.keys() - cells.keys()
+                    log.info(f'Topology of ManagedElement={me} changed: added {sorted(added)}, removed {sorted(removed)}')
+                    self.elements[me] = cells
+                    changed = True
+            if changed:
+                self.merge()
+                self.save()
+            return fetched > 0
+
+    def load(self):
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path) as file:
+                cached = json.load(file)
+        except FileNotFoundError:
+            return
+        except Exception as ex:
+            log.warning(f'Ignoring unreadable topology cache {self.cache_path}: {ex}')
+            return
+        self.elements = {me: cells for me, cells in cached.get('managed_elements', {}).items()
+                         if me in self.managed_elements}
+        self.merge()
+        log.info(f'Loaded {len(self.cell_urls)} cells from topology cache {self.cache_path}')
+
+    def merge(self):
+        merged = {}
+        for cells in self.elements.values():
+            merged.update(cells)
+        # Swapped in one go, readers never see a partial map
+        self.cell_urls = merged
+
+    def save(self):
+        if not self.cache_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w') as file:
+                json.dump({'managed_elements': self.elements}, file)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as ex:
+            log.warning(f'Unable to write topology cache {self.cache_path}: {ex}')
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Offline training of the load predictor. Saves a versioned artifact that the
+# predictor service loads at startup, e.g.
+#   python train_model.py --data load_test.csv --model-dir models
+# --data may also be the PRB store written by the rApp (PRB_STORE_PATH), whose
+# fleet load series, or with --per-cell the series of every cell, is then used.
+# With --incremental the latest artifact is trained further on the most recent
+# samples, and only made the served version if it forecasts them as well as
+# the current one, e.g.
+#   python train_model.py --incremental --data /tmp/es-rapp/prb-store --model-dir models
+
+import argparse
+import os
+from tensorflow import keras
+from keras.models import Sequential
+from keras.layers import Dense
+from keras.callbacks import EarlyStopping
+
+import model_artifacts
+from training_data import WindowDataset, load_series, series_length, split_series, tail_series
+
+
+def model_dnn(look_back, horizon=1):
+    # One output per forecast step, so a single inference covers the whole horizon
+    model = Sequential()
+    model.add(Dense(units=32, input_dim=look_back, activation='relu'))
+    model.add(Dense(look_back, activation='relu'))
+    model.add(Dense(horizon))
+
+    model.compile(loss= "mse",  optimizer='adam',metrics = ['mse', 'mae'])
+    return model
+
+
+def train(data_path, look_back=8, train_size=300, epochs=100, seed=None, horizon=6, per_cell=False,
+          batch_size=10, workers=1):
+    # The first train_size samples of every series are used for training, the rest for validation
+    if seed is not None:
+        keras.utils.set_random_seed(seed)
+
+    parts = [split_series(series, train_size) for series in load_series(data_path, per_cell)]
+    loader = dict(batch_size=batch_size, workers=workers, use_multiprocessing=False)
+    train_data = WindowDataset([part[0] for part in parts], look_back, horizon, **loader)
+    test_data = WindowDataset([part[1] for part in parts], look_back, horizon, **loader)
+    model = model_dnn(look_back, horizon)
+    history = model.fit(train_data, epochs=epochs, verbose=1, validation_data=test_data,callbacks=[EarlyStopping(monitor='val_loss', patience=10)])
+
+    metadata = {
+        'look_back': look_back,
+        'horizon': horizon,
+        'data': data_path,
+        'train_size': train_size,
+        'per_cell': per_cell,
+        'train_windows': train_data.windows,
+        'epochs': len(history.epoch),
+        'seed': seed,
+        'val_loss': float(history.history['val_loss'][-1]),
+    }
+    return model, metadata
+
+
+def retrain(data_path, model_dir, base_version=None, recent=8640, holdout=0.2, epochs=5, per_cell=False,
+            batch_size=10, workers=1):
+    # Continues training an artifact (default: the latest) on the last 'recent'
+    # samples of every series. The last 'holdout' fraction of them is kept for
+    # validation, on which the base model and the candidate are both scored.
+    base_version = base_version or model_artifacts.latest_version(model_dir)
+    model, base_metadata = model_artifacts.load(model_dir, base_version, 'keras')
+    look_back, horizon = base_metadata['look_back'], base_metadata.get('horizon', 1)
+
+    parts = []
+    for series in load_series(data_path, per_cell):
+        series = tail_series(series, recent)
+        parts.append(split_series(series, series_length(series) - int(series_length(series) * holdout)))
+    loader = dict(batch_size=batch_size, workers=workers, use_multiprocessing=False)
+    train_data = WindowDataset([part[0] for part in parts], look_back, horizon, shuffle=True, **loader)
+    test_data = WindowDataset([part[1] for part in parts], look_back, horizon, **loader)
+    if not train_data.windows or not test_data.windows:
+        raise ValueError(f'Not enough recent samples in {data_path} to retrain')
+
+    base_val_loss = float(model.evaluate(test_data, verbose=0)[0])
+    history = model.fit(train_data, epochs=epochs, verbose=0, validation_data=test_data)
+    metadata = {name: value for name, value in base_metadata.items() if name != 'version'}
+    metadata.update({
+        'data': data_path,
+        'base_version': base_version,
+        'per_cell': per_cell,
+        'recent_samples': recent,
+        'train_windows': train_data.windows,
+        'epochs': len(history.epoch),
+        'val_loss': float(history.history['val_loss'][-1]),
+        'base_val_loss': base_val_loss,
+    })
+    return model, metadata
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the load predictor and save a versioned model artifact')
+    parser.add_argument('--data', default='load_test.csv', help='CSV file with a Load column, or a PRB store directory')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--look-back', type=int, default=8)
+    parser.add_argument('--horizon', type=int, default=6, help='Number of future steps forecast per inference')
+    parser.add_argument('--train-size', type=int, default=300)
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--per-cell', action='store_true', help='Train on the series of every cell of a PRB store')
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Threads preparing training batches')
+    parser.add_argument('--no-latest', action='store_true', help='Do not make the new version the served one')
+    parser.add_argument('--incremental', action='store_true', help='Train the latest version further on recent samples')
+    parser.add_argument('--recent', type=int, default=8640, help='Samples per series used with --incremental')
+    parser.add_argument('--holdout', type=float, default=0.2, help='Fraction of the recent samples used for validation')
+    parser.add_argument('--max-regression', type=float, default=0.0,
+                        help='With --incremental, largest relative increase of the validation loss that is still served')
+    args = parser.parse_args()
+
+    if args.incremental:
+        if args.seed is not None:
+            keras.utils.set_random_seed(args.seed)
+        model, metadata = retrain(args.data, args.model_dir, None, args.recent, args.holdout, args.epochs,
+                                  args.per_cell, args.batch_size, args.workers)
+        # A candidate that forecasts the recent samples worse than its base is kept but not served
+        accepted = metadata['val_loss'] <= metadata['base_val_loss'] * (1 + args.max_regression)
+        version = model_artifacts.save(model, args.model_dir, metadata, make_latest=accepted and not args.no_latest)
+        print(f'Saved model version {version} to {args.model_dir} (val_loss {metadata["val_loss"]:.3f}, '
+              f'{metadata["base_version"]}: {metadata["base_val_loss"]:.3f}, {"accepted" if accepted else "rejected"})')
+    else:
+        model, metadata = train(args.data, args.look_back, args.train_size, args.epochs, args.seed, args.horizon,
+                                args.per_cell, args.batch_size, args.workers)
+        version = model_artifacts.save(model, args.model_dir, metadata, make_latest=not args.no_latest)
+        print(f'Saved model version {version} to {args.model_dir} (val_loss {metadata["val_loss"]:.3f})')
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+#SPDX-License-Identifier: Apache-2.0
+#Copyright 2024 Intel Corporation
+
+# Training data of the load predictor. A load series is a 1-D array (memory
+# mapped from the PRB store or a CSV file) or a (values, rows) pair selecting the
+# samples of one cell. Windows of look_back inputs and horizon targets are
+# stride views of a series and are only copied one batch at a time. Batches are
+# prepared by PyDataset worker threads; processes would each need a copy of
+# the series, so use_multiprocessing is left off.
+
+import math
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from keras.utils import PyDataset
+
+from prb_store import PrbStore
+
+CSV_CHUNK_ROWS = 1 << 16
+
+
+def series_length(series):
+    return len(series[1]) if isinstance(series, tuple) else len(series)
+
+
+def split_series(series, size):
+    # First 'size' samples and the rest, both views
+    if isinstance(series, tuple):
+        values, rows = series
+        return (values, rows[:size]), (values, rows[size:])
+    return series[:size], series[size:]
+
+
+def tail_series(series, size):
+    # Last 'size' samples, a view
+    if isinstance(series, tuple):
+        values, rows = series
+        return values, rows[-size:]
+    return series[-size:]
+
+
+def gather_windows(series, starts, length):
+    # Copies of the windows starting at 'starts'
+    if isinstance(series, tuple):
+        values, rows = series
+        return np.asarray(values[sliding_window_view(rows, length)[starts]], dtype=np.float32)
+    return np.asarray(sliding_window_view(series, length)[starts], dtype=np.float32)
+
+
+def csv_series(path, chunk_rows=CSV_CHUNK_ROWS):
+    # Load column of a CSV file. It is parsed a chunk at a time into an unlinked
+    # temporary file that is memory mapped, so only one chunk is held in memory.
+    rows = 0
+    with tempfile.TemporaryFile(prefix='load-series-') as file:
+        for chunk in pd.read_csv(path, usecols=['Load'], chunksize=chunk_rows):
+            values = chunk['Load'].to_numpy('<f4')
+            file.write(values.tobytes())
+            rows += len(values)
+        if rows == 0:
+            return [np.empty(0, np.float32)]
+        file.flush()
+        # The map keeps its own descriptor, the file is gone once it is released
+        return [np.memmap(file, dtype='<f4', mode='r', shape=(rows,))]
+
+
+def store_series(path, per_cell=False):
+    # Series of a PRB store, memory mapped. The fleet load is split at NaN gaps;
+    # per cell there is one series per cell and store segment.
+    store = PrbStore(path, readonly=True)
+    series = []
+    if not per_cell:
+        for load in store.fleet_load():
+            valid = ~np.isnan(load)
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], valid, [False])).astype(np.int8)))
+            series.extend(load[start:end] for start, end in zip(edges[::2], edges[1::2]))
+        return series
+    for columns in store.cells:
+        cells = columns['cell']
+        if not len(cells):
+            continue
+        rows = np.argsort(cells, kind='stable').astype(np.int32)
+        boundaries = np.flatnonzero(np.diff(cells[rows])) + 1
+        series.extend((columns['prb'], cell_rows) for cell_rows in np.split(rows, boundaries))
+    return series
+
+
+def load_series(data_path, per_cell=False):
+    if os.path.isdir(data_path):
+        return store_series(data_path, per_cell)
+    return csv_series(data_path)
+
+
+class WindowDataset(PyDataset):
+    # Batches of windows over any number of series; windows never cross from
+    # one series into the next. Batches can be built by several workers.
+    def __init__(self, series, look_back, horizon=1, batch_size=32, shuffle=False, seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.look_back = look_back
+        self.length = look_back + horizon
+        self.batch_size = batch_size
+        self.series = [s for s in series if series_length(s) >= self.length]
+        counts = [series_length(s) - self.length + 1 for s in self.series]
+        self.offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+        self.order = self.rng.permutation(self.windows) if shuffle else None
+
+    @property
+    def windows(self):
+        return int(self.offsets[-1])
+
+    def __len__(self):
+        return math.ceil(self.windows / self.batch_size)
+
+    def __getitem__(self, index):
+        first = index * self.batch_size
+        last = min(first + self.batch_size, self.windows)
+        positions = self.order[first:last] if self.order is not None else np.arange(first, last)
+        owners = np.searchsorted(self.offsets, positions, side='right') - 1
+        batch = np.empty((len(positions), self.length), dtype=np.float32)
+        for owner in np.unique(owners):
+            selected = owners == owner
+            batch[selected] = gather_windows(self.series[owner], positions[selected] - self.offsets[owner], self.length)
+        return batch[:, :self.look_back], batch[:, self.look_back:]
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self.order = self.rng.permutation(self.windows)